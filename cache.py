@@ -0,0 +1,91 @@
+import json
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+
+_UNSAFE_KEY_CHARS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+class TTLCache:
+    """Small thread-safe TTL cache with optional per-key JSON persistence.
+
+    Entries expire `ttl` seconds after being stored. When `directory` is given,
+    values are also written to `<directory>/<key>.json` so they survive across
+    CLI invocations; values must therefore be JSON-serializable.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 4096, directory: Optional[str] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._data: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+        if entry is None:
+            entry = self._load(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if now - stored_at > self.ttl:
+            self.invalidate(key)
+            return None
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        entry = (time.time(), value)
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = entry
+            while len(self._data) > self.maxsize:
+                self._data.pop(next(iter(self._data)))
+        self._store(key, entry)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+        path = self._path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def _path(self, key: str) -> Optional[Path]:
+        if self.directory is None:
+            return None
+        return self.directory / f"{_UNSAFE_KEY_CHARS.sub('_', key)}.json"
+
+    def _load(self, key: str) -> Optional[Tuple[float, Any]]:
+        path = self._path(key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            entry = (float(payload["stored_at"]), payload["value"])
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            self.logger.debug("Ignoring unreadable cache file %s: %s", path, exc)
+            return None
+        with self._lock:
+            self._data[key] = entry
+        return entry
+
+    def _store(self, key: str, entry: Tuple[float, Any]) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({"stored_at": entry[0], "value": entry[1]}), encoding="utf-8")
+        except (OSError, TypeError, ValueError) as exc:
+            self.logger.debug("Could not persist cache entry %s: %s", key, exc)
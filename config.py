@@ -1,10 +1,16 @@
 import csv
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
 
 from py_clob_client.client import ClobClient
+from py_clob_client.clob_types import BookParams
+from py_clob_client.exceptions import PolyApiException
 
+from cache import TTLCache
 from logging_config import configure_logging
 from settings import load_settings
 
@@ -15,19 +21,94 @@ def _first_wallet(csv_name: str) -> Optional[Dict[str, str]]:
     if not path.exists():
         return None
     with path.open(newline="") as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
         try:
-            row = next(reader)
-            return {"private_key": row["private_key"].strip(), "funder": row["funder"].strip()}
-        except StopIteration:
+            header = next(reader)
+            row = next(filter(None, reader))
+            pk_idx, funder_idx = header.index("private_key"), header.index("funder")
+            return {"private_key": row[pk_idx].strip(), "funder": row[funder_idx].strip()}
+        except (StopIteration, ValueError, IndexError):
             return None
 
 
+T = TypeVar("T")
+
+_price = itemgetter("price")
+
+# Qualifying spreads (0.002-0.004) in 1e-4 ticks, the finest CLOB price increment
+_SPREAD_TICK_SCALE = 10_000
+_ALLOWED_SPREAD_TICKS = frozenset({20, 30, 40})
+
+# The only market fields the scan and cheap_markets.txt consume
+_SCAN_MARKET_FIELDS = ("condition_id", "question", "tokens")
+
+
+# Throttling and transient server errors; status None means the request itself failed
+_RETRYABLE_STATUSES = frozenset({None, 429, 500, 502, 503, 504})
+
+
+def _call_with_retries(fn: Callable[..., T], *args, attempts: int = 3, backoff: float = 0.2) -> T:
+    """Call `fn(*args)`, retrying with exponential backoff on retryable `PolyApiException`s only."""
+    for attempt in range(attempts):
+        try:
+            return fn(*args)
+        except PolyApiException as exc:
+            if attempt == attempts - 1 or exc.status_code not in _RETRYABLE_STATUSES:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+    raise AssertionError("unreachable")
+
+
+def _token_pairs(market: Dict) -> List[Dict[str, str]]:
+    """Extract the immutable token_id/outcome pairs from a market payload."""
+    return [{"token_id": t.get("token_id"), "outcome": t.get("outcome")} for t in market.get("tokens", [])]
+
+
+def score_orderbook(ob: Dict[str, Dict[str, List[Dict[str, float]]]]) -> Optional[Tuple[float, float]]:
+    """Return `(spread, price)` for a two-sided Yes/No book with an allowed spread, else None.
+
+    `spread` is the wider of the two sides' spreads and `price` the cheaper best ask.
+    """
+    spreads: List[float] = []
+    asks: List[float] = []
+    for outcome in ("Yes", "No"):
+        side = ob.get(outcome, {})
+        bids = side.get("bids", [])
+        ask_list = side.get("asks", [])
+        if not bids or not ask_list:
+            return None
+
+        best_bid = max(map(_price, bids))
+        best_ask = min(map(_price, ask_list))
+
+        spreads.append(best_ask - best_bid)
+        asks.append(best_ask)
+
+    spread = max(spreads)
+    if round(spread * _SPREAD_TICK_SCALE) not in _ALLOWED_SPREAD_TICKS:
+        return None
+    return spread, min(asks)
+
+
 class PolymarketClient:
     """Thin wrapper around ClobClient for basic market queries used by scanner."""
 
-    def __init__(self, host: str, chain_id: int, key: str, funder: str, signature_type: int = 2):
+    # token_id/outcome pairs never change for a market; status fields do
+    TOKENS_TTL_SEC = 24 * 60 * 60
+    DETAILS_TTL_SEC = 30
+
+    def __init__(self, host: str, chain_id: int, key: str, funder: str, signature_type: int = 2,
+                 max_workers: int = 32, cache_dir: Optional[str] = None, markets_ttl_sec: float = 60.0):
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.max_workers = max(1, max_workers)
+        self._details_cache = TTLCache(ttl=self.DETAILS_TTL_SEC)
+        self._tokens_cache = TTLCache(
+            ttl=self.TOKENS_TTL_SEC,
+            directory=str(Path(cache_dir) / "markets") if cache_dir else None,
+        )
+        self._open_markets_cache = TTLCache(ttl=markets_ttl_sec, maxsize=1, directory=cache_dir)
+        # scored results per top_n, persisted so back-to-back scans skip the orderbook fan-out
+        self._top_markets_cache = TTLCache(ttl=markets_ttl_sec, maxsize=8, directory=cache_dir)
         self.client = ClobClient(
             host=host,
             chain_id=chain_id,
@@ -36,68 +117,92 @@ class PolymarketClient:
             funder=funder,
         )
 
-    def get_top_markets_by_price(self, top_n: int = 50) -> List[Dict]:
-        allowed_spreads = {0.002, 0.003, 0.004}
-        candidates: List[Dict] = []
+    def get_top_markets_by_price(self, top_n: int = 50, refresh: bool = False) -> List[Dict]:
+        """Score all open markets concurrently and return the cheapest `top_n` candidates.
 
-        for market in self.get_all_markets():
-            try:
-                ob = self.get_orderbook(market["condition_id"])
-            except Exception as exc:
-                self.logger.debug("Skipping market without orderbook: %s", exc)
-                continue
+        Each market dict gains float `price` and `spread` keys.
+
+        Results are reused for `markets_ttl_sec`, across runs when a cache_dir is set;
+        `refresh=True` ignores the cached top list and market walk and rescans.
+        """
+        key = f"top_markets_{top_n}"
+        if refresh:
+            self._open_markets_cache.invalidate("open_markets")
+        else:
+            cached = self._top_markets_cache.get(key)
+            if cached is not None:
+                return cached
 
-            spreads: List[float] = []
-            asks: List[float] = []
-            for outcome in ("Yes", "No"):
-                side = ob.get(outcome, {})
-                bids = side.get("bids", [])
-                ask_list = side.get("asks", [])
-                if not bids or not ask_list:
-                    break
-
-                best_bid = max(b["price"] for b in bids)
-                best_ask = min(a["price"] for a in ask_list)
-
-                spreads.append(best_ask - best_bid)
-                asks.append(best_ask)
-            else:
-                spread = max(spreads)
-                if any(abs(spread - s) < 1e-9 for s in allowed_spreads):
-                    market["spread"] = spread
-                    market["price"] = min(asks)
-                    candidates.append(market)
+        markets = self.get_all_markets()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            scored = executor.map(self._score_market, markets)
+            candidates = [m for m in scored if m is not None]
 
         candidates.sort(key=lambda m: m["price"])  # type: ignore[index]
-        return candidates[:top_n]
+        top = candidates[:top_n]
+        self._top_markets_cache.set(key, top)
+        return top
+
+    def _score_market(self, market: Dict) -> Optional[Dict]:
+        """Return the market annotated with spread/price if it qualifies, else None."""
+        try:
+            ob = self.get_orderbook(market["condition_id"], tokens=market.get("tokens") or None)
+        except (PolyApiException, KeyError, ValueError) as exc:
+            self.logger.debug("Skipping market without orderbook: %s", exc)
+            return None
+
+        score = score_orderbook(ob)
+        if score is None:
+            return None
+        spread, price = score
+        market["spread"] = spread
+        market["price"] = price
+        return market
 
     def get_all_markets(self) -> List[Dict]:
+        """Return all open markets, reusing the last full walk for `markets_ttl_sec`."""
+        cached = self._open_markets_cache.get("open_markets")
+        if cached is not None:
+            return cached
+
         open_markets: List[Dict] = []
         next_cursor = ""
 
         while next_cursor != "LTE=":
             response = self.client.get_markets(next_cursor=next_cursor)
-            markets_data = response.get("data", [])
-
-            for market in markets_data:
-                if not market.get("closed") and market.get("active"):
-                    open_markets.append(market)
+            open_markets.extend(
+                {field: market.get(field) for field in _SCAN_MARKET_FIELDS}
+                for market in response.get("data", [])
+                if market.get("active") and not market.get("closed")
+            )
 
             next_cursor = response.get("next_cursor", "LTE=")
 
+        self._open_markets_cache.set("open_markets", open_markets)
         return open_markets
 
-    def get_orderbook(self, condition_id: str) -> Dict[str, Dict[str, List[Dict[str, float]]]]:
-        market = self.get_market_details(condition_id)
-        if not market:
+    def get_orderbook(self, condition_id: str,
+                      tokens: Optional[List[Dict]] = None) -> Dict[str, Dict[str, List[Dict[str, float]]]]:
+        """Return `{outcome: {bids, asks}}` for every token of the market.
+
+        All token books are fetched in a single `POST /books` round-trip. Pass
+        `tokens` (e.g. from a `get_markets` page) to skip the market lookup.
+        """
+        if tokens is None:
+            tokens = self.get_market_tokens(condition_id)
+        if tokens is None:
             raise ValueError(f"Market with condition_id '{condition_id}' not found.")
 
-        orderbook_data: Dict[str, Dict[str, List[Dict[str, float]]]] = {}
-        for token in market.get("tokens", []):
-            token_id = token.get("token_id")
-            outcome = token.get("outcome")
-            orderbook = self.client.get_order_book(token_id)
+        outcomes = {t.get("token_id"): t.get("outcome") for t in tokens}
+        books = _call_with_retries(
+            self.client.get_order_books, [BookParams(token_id=token_id) for token_id in outcomes]
+        )
 
+        orderbook_data: Dict[str, Dict[str, List[Dict[str, float]]]] = {}
+        for orderbook in books:
+            outcome = outcomes.get(orderbook.asset_id)
+            if outcome is None:
+                continue
             orderbook_data[outcome] = {
                 "bids": [{"price": float(b.price), "size": float(b.size)} for b in orderbook.bids],
                 "asks": [{"price": float(a.price), "size": float(a.size)} for a in orderbook.asks],
@@ -105,12 +210,33 @@ class PolymarketClient:
 
         return orderbook_data
 
+    def get_market_tokens(self, condition_id: str) -> Optional[List[Dict]]:
+        """Return the market's `[{token_id, outcome}]` list, cached for `TOKENS_TTL_SEC`."""
+        tokens = self._tokens_cache.get(condition_id)
+        if tokens is not None:
+            return tokens
+        market = self.get_market_details(condition_id)
+        if not market:
+            return None
+        return _token_pairs(market)
+
     def get_market_details(self, condition_id: str) -> Optional[Dict]:
+        cached = self._details_cache.get(condition_id)
+        if cached is not None:
+            return cached
         try:
-            return self.client.get_market(condition_id)
-        except Exception as exc:
+            market = _call_with_retries(self.client.get_market, condition_id)
+        except PolyApiException as exc:
             logging.getLogger(self.__class__.__name__).warning("Error fetching market %s: %s", condition_id, exc)
             return None
+        if not market:
+            return market
+        if market.get("closed"):
+            self._tokens_cache.invalidate(condition_id)
+        else:
+            self._tokens_cache.set(condition_id, _token_pairs(market))
+        self._details_cache.set(condition_id, market)
+        return market
 
 
 def build_scanner_client() -> Optional[PolymarketClient]:
@@ -126,4 +252,7 @@ def build_scanner_client() -> Optional[PolymarketClient]:
         key=wallet["private_key"],
         funder=wallet["funder"],
         signature_type=settings.clob_signature_type,
+        max_workers=settings.scan_workers,
+        cache_dir=settings.cache_dir,
+        markets_ttl_sec=settings.markets_cache_ttl_sec,
     )
@@ -4,62 +4,120 @@ import argparse
 import csv
 import logging
 import random
+import sqlite3
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from decimal import Decimal, ROUND_DOWN
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
 
-import requests
 from py_clob_client.client import ClobClient
 from py_clob_client.clob_types import OrderArgs, OrderType
+from py_clob_client.exceptions import PolyApiException
 
+from cache import TTLCache
 from database_manager import DatabaseManager
+from http_session import DEFAULT_TIMEOUT, build_session, json_body
 from logging_config import configure_logging
 from settings import load_settings
 
+T = TypeVar("T")
+
+# Shared keep-alive session so polling loops reuse TLS connections
+_SESSION = build_session()
+
+# Last observed 'Yes' volume per (proxy_wallet, condition_id) -> (volume, monotonic time)
+_POSITION_CACHE: Dict[Tuple[str, str], Tuple[float, float]] = {}
+# Readings this recent are reused, e.g. a hop's post-balance as the next hop's start
+_POSITION_REUSE_SEC = 2.0
+# Fetches several wallets' positions in one round-trip window
+# (pools are shared by every market the runner drives in this process; threads start lazily)
+_POSITION_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="positions")
+
+# A stored NBBO snapshot this recent (e.g. from a parallel run) is reused at session start
+NBBO_MAX_AGE_SEC = 2.0
+
+# Posts the two legs of a match concurrently so both reach the book in one round-trip
+_ORDER_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="order")
+# Signs the next hop's orders (EIP-712) while the current hop settles
+_SIGN_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="sign")
+
+# Market metadata (tokens/outcomes) is effectively immutable; persist it across runs
+_MARKET_DATA_TTL_SEC = 24 * 60 * 60
+_market_cache: Optional[TTLCache] = None
+
+
+def _get_market_cache() -> TTLCache:
+    global _market_cache
+    if _market_cache is None:
+        cache_dir = Path(load_settings().cache_dir) / "rewards_markets"
+        _market_cache = TTLCache(ttl=_MARKET_DATA_TTL_SEC, directory=str(cache_dir))
+    return _market_cache
+
+
 def record_sequence(db_manager: DatabaseManager, session_uuid: str, iteration_number: int, group: List[Dict],
                     mark_initial: bool = False, mark_final: bool = False) -> None:
-    """Persist one row per wallet in the chain into `chain_sequences`."""
-    for order, wallet in enumerate(group):
-        db_manager.add_chain_step(
-            session_uuid=session_uuid,
-            iteration_number=iteration_number,
-            sequence_order=order,
-            wallet_id=wallet['db_id'],
-            is_initial_buy=(mark_initial and order == 0),
-            is_final_sell=(mark_final and order == len(group) - 1),
+    """Persist one row per wallet in the chain into `chain_sequences` with a single batch insert."""
+    db_manager.add_chain_batch(session_uuid, [
+        (
+            iteration_number,
+            order,
+            wallet['db_id'],
+            mark_initial and order == 0,
+            mark_final and order == len(group) - 1,
         )
+        for order, wallet in enumerate(group)
+    ])
+
+@lru_cache(maxsize=None)
+def _quantum(digits: int) -> Decimal:
+    return Decimal(f'1e-{digits}')
 
+@lru_cache(maxsize=1024)
 def quantize_decimal(val: float, digits: int = 5) -> Decimal:
-    return Decimal(str(val)).quantize(Decimal(f'1e-{digits}'), rounding=ROUND_DOWN)
+    """Round `val` down to `digits` decimals; memoized since prices sit on a small tick grid."""
+    return Decimal(str(val)).quantize(_quantum(digits), rounding=ROUND_DOWN)
 
 def get_prices_and_tokens(condition_id: str, side: str, db_manager: Optional[DatabaseManager] = None) -> str:
     """Fetch token_id for given condition/outcome side ("yes" or "no")."""
-    url = f"https://clob.polymarket.com/rewards/markets/{condition_id}"
-    resp = requests.get(url)
-    resp.raise_for_status()
-    market_data = resp.json()['data'][0]
+    cache = _get_market_cache()
+    market_data = cache.get(condition_id)
+    if market_data is None:
+        url = f"https://clob.polymarket.com/rewards/markets/{condition_id}"
+        resp = _SESSION.get(url, timeout=DEFAULT_TIMEOUT)
+        resp.raise_for_status()
+        market_data = json_body(resp)['data'][0]
+        cache.set(condition_id, market_data)
 
     # Store market condition and tokens in DB
     if db_manager:
         try:
+            token_rows = [
+                (token['token_id'], condition_id, token['outcome'].lower(), token.get('outcome', ''))
+                for token in market_data['tokens']
+            ]
             with db_manager.get_connection() as conn:
-                conn.execute(
-                    """INSERT OR REPLACE INTO market_conditions (condition_id, title, description, category, status)
-                       VALUES (?, ?, ?, ?, ?)""",
-                    (condition_id,
-                     market_data.get('question', 'Unknown Market'),
-                     market_data.get('description', ''),
-                     market_data.get('category', ''),
-                     'active')
-                )
-                for token in market_data['tokens']:
+                # one transaction for the market and its tokens; rows already stored are left as-is
+                # (REPLACE would delete and re-insert them, cascading to tokens)
+                with conn:
                     conn.execute(
-                        """INSERT OR REPLACE INTO tokens (token_id, condition_id, outcome_side, outcome_label)
-                           VALUES (?, ?, ?, ?, ?)""",
-                        (token['token_id'], condition_id, token['outcome'].lower(), token.get('outcome', ''))
+                        """INSERT INTO market_conditions (condition_id, title, description, category, status)
+                           VALUES (?, ?, ?, ?, ?)
+                           ON CONFLICT(condition_id) DO NOTHING""",
+                        (condition_id,
+                         market_data.get('question', 'Unknown Market'),
+                         market_data.get('description', ''),
+                         market_data.get('category', ''),
+                         'active')
+                    )
+                    conn.executemany(
+                        """INSERT INTO tokens (token_id, condition_id, outcome_side, outcome_label)
+                           VALUES (?, ?, ?, ?)
+                           ON CONFLICT(token_id) DO NOTHING""",
+                        token_rows
                     )
-                conn.commit()
             db_manager.log_message(f"Market condition {condition_id} stored in database", "INFO")
         except Exception as exc:
             db_manager.log_message(f"Failed to store market condition: {str(exc)}", "WARNING")
@@ -73,25 +131,129 @@ def get_prices_and_tokens(condition_id: str, side: str, db_manager: Optional[Dat
 def fetch_nbbo(token_id: str) -> Tuple[Optional[float], Optional[float]]:
     """Return (best_bid, best_ask) for the given token_id."""
     url = f"https://clob.polymarket.com/book?token_id={token_id}"
-    resp = requests.get(url)
+    resp = _SESSION.get(url, timeout=DEFAULT_TIMEOUT)
     resp.raise_for_status()
-    data = resp.json()
-    bids = [float(b['price']) for b in data.get('bids', [])]
-    asks = [float(a['price']) for a in data.get('asks', [])]
-    return (max(bids) if bids else None, min(asks) if asks else None)
+    data = json_body(resp)
+    best_bid = max((float(b['price']) for b in data.get('bids', ())), default=None)
+    best_ask = min((float(a['price']) for a in data.get('asks', ())), default=None)
+    return best_bid, best_ask
 
 
-def get_yes_position_volume(proxy_wallet: str, condition_id: str) -> float:
+def get_yes_position_volume(proxy_wallet: str, condition_id: str, max_age: float = 0.0) -> float:
     """
     Returns the number of 'Yes' shares owned for a given market (condition_id),
     using a Polymarket proxy wallet address.
+
+    With `max_age > 0`, a reading taken within the last `max_age` seconds is
+    reused instead of hitting the positions endpoint again.
     """
+    key = (proxy_wallet, condition_id)
+    if max_age > 0:
+        cached = _POSITION_CACHE.get(key)
+        if cached is not None and time.monotonic() - cached[1] <= max_age:
+            return cached[0]
     url = "https://data-api.polymarket.com/positions"
     params = {"user": proxy_wallet, "market": condition_id, "limit": 100}
-    resp = requests.get(url, params=params)
+    resp = _SESSION.get(url, params=params, timeout=DEFAULT_TIMEOUT)
     resp.raise_for_status()
-    positions = resp.json()
-    return sum(pos.get("size", 0) for pos in positions if pos.get("outcome", "").lower() == "yes")
+    positions = json_body(resp)
+    volume = sum(pos.get("size", 0) for pos in positions if pos.get("outcome", "").lower() == "yes")
+    _POSITION_CACHE[key] = (volume, time.monotonic())
+    return volume
+
+
+def get_yes_position_volumes(proxy_wallets: Sequence[str], condition_id: str,
+                             max_age: float = 0.0) -> List[float]:
+    """Fetch 'Yes' volumes for several wallets concurrently; results keep argument order."""
+    return list(_POSITION_POOL.map(
+        lambda wallet: get_yes_position_volume(wallet, condition_id, max_age), proxy_wallets
+    ))
+
+
+def invalidate_positions(proxy_wallet: str) -> None:
+    """Drop cached position readings for a wallet, e.g. after it posts an order."""
+    for key in [k for k in list(_POSITION_CACHE) if k[0] == proxy_wallet]:
+        _POSITION_CACHE.pop(key, None)
+
+
+def backoff_delays(steps: int, start: float = 0.5, factor: float = 1.6, cap: float = 8.0) -> Tuple[float, ...]:
+    """Return `steps` exponentially growing sleep intervals, each at most `cap` seconds."""
+    return tuple(min(start * factor ** n, cap) for n in range(steps))
+
+
+# Backoff schedules for settlement polling; totals match the old fixed sleeps (~13s / ~8s)
+_FILL_POLL_DELAYS = backoff_delays(6)
+_MATCH_POLL_DELAYS = backoff_delays(5)
+
+
+def poll_with_backoff(probe: Callable[[], T], done: Callable[[T], bool],
+                      delays: Sequence[float] = _FILL_POLL_DELAYS) -> T:
+    """Call `probe` after each delay until `done(result)` or the schedule runs out.
+
+    Returns the last probed result, so callers can still handle partial fills.
+    """
+    result = None
+    for delay in delays:
+        time.sleep(delay)
+        result = probe()
+        if done(result):
+            break
+    return result
+
+
+def wait_for_position(proxy_wallet: str, condition_id: str, target: float,
+                      delays: Sequence[float] = _FILL_POLL_DELAYS) -> float:
+    """Poll the 'Yes' position with backoff until it reaches `target`; return the last volume."""
+    return poll_with_backoff(
+        lambda: get_yes_position_volume(proxy_wallet, condition_id),
+        lambda volume: volume >= target,
+        delays,
+    )
+
+
+def _place_order(client: ClobClient, args: OrderArgs, presigned: Optional[Future] = None):
+    order = presigned.result() if presigned is not None else client.create_order(args)
+    return client.post_order(order, orderType=OrderType.GTC)
+
+
+def presign_orders(*orders: Tuple[Dict, OrderArgs]) -> List[Future]:
+    """Start signing each `(wallet, OrderArgs)` in the background; pass the result to `place_orders`."""
+    return [_SIGN_POOL.submit(wallet['client'].create_order, args) for wallet, args in orders]
+
+
+def place_orders(*orders: Tuple[Dict, OrderArgs], presigned: Optional[Sequence[Future]] = None) -> List:
+    """Sign and post each `(wallet, OrderArgs)` concurrently; responses keep argument order.
+
+    `presigned` holds futures from `presign_orders` for the same orders, in the same order.
+    """
+    for wallet, _ in orders:
+        invalidate_positions(wallet['wallet_address'])
+    signed = presigned or [None] * len(orders)
+    futures = [
+        _ORDER_POOL.submit(_place_order, wallet['client'], args, order)
+        for (wallet, args), order in zip(orders, signed)
+    ]
+    return [fut.result() for fut in futures]
+
+
+_CLOSED_ORDER_STATUSES = frozenset({"MATCHED", "CANCELED", "CANCELLED", "INVALID"})
+
+
+def cancel_if_open(client: ClobClient, order_id: str):
+    """Cancel `order_id` unless the CLOB already reports it filled or cancelled.
+
+    Returns the cancel response, or None when no cancel was needed.
+    """
+    try:
+        order = client.get_order(order_id)
+    except PolyApiException as exc:
+        logging.getLogger(__name__).debug("Order %s state unknown (%s); cancelling anyway", order_id, exc)
+        order = None
+    status = str((order or {}).get("status", "")).upper().replace("ORDER_STATUS_", "")
+    if status in _CLOSED_ORDER_STATUSES:
+        logging.getLogger(__name__).debug("Order %s already %s; skip cancel", order_id, status)
+        return None
+    return client.cancel(order_id)
 
 
 def init_client(private_key: str, funder: str, host: str, chain_id: int, signature_type: int) -> ClobClient:
@@ -110,32 +272,21 @@ def init_client(private_key: str, funder: str, host: str, chain_id: int, signatu
 
 def load_wallets(csv_path: str, db_manager: DatabaseManager) -> List[Dict]:
     """Load (private_key, funder) pairs and store wallets in DB."""
-    wallets: List[Dict] = []
-    with open(csv_path, newline='') as f:
-        reader = csv.DictReader(f)
-        for idx, row in enumerate(reader):
-            private_key = row['private_key']
-            funder = row['funder']
-            try:
-                wallet_id = db_manager.add_wallet(
-                    wallet_index=idx,
-                    private_key=private_key,
-                    funder_address=funder,
-                    nickname=f"Wallet_{idx}"
-                )
-                db_manager.log_message(f"Added wallet {idx} to database", "INFO")
-            except Exception:
-                existing = db_manager.get_wallets(active_only=False)
-                wallet_id = next((w['id'] for w in existing if w['wallet_index'] == idx), None)
-                if not wallet_id:
-                    raise
-                db_manager.log_message(f"Using existing wallet {idx}", "INFO")
-            wallets.append({
-                'private_key': private_key,
-                'wallet_address': funder,
-                'db_id': wallet_id
-            })
-    return wallets
+    with Path(csv_path).open(newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        pk_idx, funder_idx = header.index('private_key'), header.index('funder')
+        rows = [
+            (idx, row[pk_idx], row[funder_idx], f"Wallet_{idx}")
+            for idx, row in enumerate(filter(None, reader))  # skip blank lines like DictReader
+        ]
+    # one transaction for the whole file; wallets already stored keep their ids
+    ids = db_manager.add_wallets_bulk(rows)
+    db_manager.log_message(f"Loaded {len(rows)} wallets from {csv_path}", "INFO")
+    return [
+        {'private_key': private_key, 'wallet_address': funder, 'db_id': ids[idx]}
+        for idx, private_key, funder, _ in rows
+    ]
 
 def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_size: float,
                 buy_price: float, mid_price: float, *, skip_initial_buy: bool = False,
@@ -161,26 +312,21 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
                     "Initial buy wallet %s: start %.4f → buying remaining %.4f @ %.4f",
                     buyer0['db_id'], start_vol0 + acquired, remaining, buy_price,
                 )
-                resp = buyer0['client'].post_order(
-                    buyer0['client'].create_order(
-                        OrderArgs(price=buy_price, size=remaining, side="BUY", token_id=token_id)
-                    ),
-                    orderType=OrderType.GTC
-                )
+                resp = place_orders(
+                    (buyer0, OrderArgs(price=buy_price, size=remaining, side="BUY", token_id=token_id))
+                )[0]
                 order_id = resp.get('orderID') if isinstance(resp, dict) else resp
                 logging.getLogger(__name__).debug("Buy order response: %s", resp)
 
-                time.sleep(random.uniform(10, 13))
-
-                post_vol0 = get_yes_position_volume(buyer0['wallet_address'], condition_id)
+                post_vol0 = wait_for_position(buyer0['wallet_address'], condition_id, start_vol0 + size)
                 acquired = post_vol0 - start_vol0
                 logging.getLogger(__name__).info("On-chain post-buy: %.4f (+%.4f)", post_vol0, acquired)
 
                 if acquired < size:
                     try:
-                        cancel_resp = buyer0['client'].cancel(order_id)
+                        cancel_resp = cancel_if_open(buyer0['client'], order_id)
                         logging.getLogger(__name__).warning("Canceled partial buy order %s: %s", order_id, cancel_resp)
-                    except Exception as exc:
+                    except PolyApiException as exc:
                         logging.getLogger(__name__).error("Could not cancel order %s: %s", order_id, exc)
 
             # now we’ve done at least one order, so `order_id` is set
@@ -197,14 +343,23 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
                 )
 
     # 2) Chain matches
+    next_presigned: Optional[List[Future]] = None
     for i in range(1, len(group)):
         seller = group[i-1]
         buyer = group[i]
         remaining = size
         attempt = 1
+        # first attempt uses orders signed during the previous hop; pre-sign the next hop now
+        presigned, next_presigned = next_presigned, None
+        if i + 1 < len(group):
+            next_presigned = presign_orders(
+                (buyer, OrderArgs(price=mid_price, size=initial_size, side="SELL", token_id=token_id)),
+                (group[i+1], OrderArgs(price=mid_price, size=initial_size, side="BUY", token_id=token_id)),
+            )
         # record starting balances for delta
-        start_seller = get_yes_position_volume(seller['wallet_address'], condition_id)
-        start_buyer = get_yes_position_volume(buyer['wallet_address'], condition_id)
+        # the seller's balance was usually just read as the previous hop's buyer
+        pair = (seller['wallet_address'], buyer['wallet_address'])
+        start_seller, start_buyer = get_yes_position_volumes(pair, condition_id, max_age=_POSITION_REUSE_SEC)
         logging.getLogger(__name__).info(
             "Match %s→%s: seller start %.4f, buyer start %.4f, size %.4f @ %.4f",
             seller['db_id'], buyer['db_id'], start_seller, start_buyer, remaining, mid_price,
@@ -214,18 +369,15 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
             logging.getLogger(__name__).debug("Attempt #%d for %.4f shares", attempt, remaining)
             sell_args = OrderArgs(price=mid_price, size=remaining, side="SELL", token_id=token_id)
             buy_args = OrderArgs(price=mid_price, size=remaining, side="BUY", token_id=token_id)
-            sell_resp = seller['client'].post_order(
-                seller['client'].create_order(sell_args), orderType=OrderType.GTC
-            )
-            buy_resp = buyer['client'].post_order(
-                buyer['client'].create_order(buy_args), orderType=OrderType.GTC
-            )
+            sell_resp, buy_resp = place_orders((seller, sell_args), (buyer, buy_args), presigned=presigned)
+            presigned = None
             logging.getLogger(__name__).debug("Sell resp: %s | Buy resp: %s", sell_resp, buy_resp)
-            time.sleep(random.uniform(4,8))
-
-            # compute deltas
-            post_seller = get_yes_position_volume(seller['wallet_address'], condition_id)
-            post_buyer = get_yes_position_volume(buyer['wallet_address'], condition_id)
+            # compute deltas, returning as soon as both legs show the full size
+            post_seller, post_buyer = poll_with_backoff(
+                lambda: get_yes_position_volumes(pair, condition_id),
+                lambda vols: start_seller - vols[0] >= remaining and vols[1] - start_buyer >= remaining,
+                _MATCH_POLL_DELAYS,
+            )
             sold = start_seller - post_seller
             bought = post_buyer - start_buyer
             logging.getLogger(__name__).info(
@@ -236,12 +388,12 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
             # full match
             if sold >= remaining and bought >= remaining:
                 if db_manager and session_uuid:
-                    db_manager.log_trade(session_uuid, buyer['db_id'], token_id,
-                                         "BUY", mid_price, remaining, "chain_match",
-                                         str(buy_resp.get('orderID', buy_resp)))
-                    db_manager.log_trade(session_uuid, seller['db_id'], token_id,
-                                         "SELL", mid_price, remaining, "chain_match",
-                                         str(sell_resp.get('orderID', sell_resp)))
+                    db_manager.log_trades(session_uuid, [
+                        (buyer['db_id'], token_id, "BUY", mid_price, remaining, "chain_match",
+                         str(buy_resp.get('orderID', buy_resp))),
+                        (seller['db_id'], token_id, "SELL", mid_price, remaining, "chain_match",
+                         str(sell_resp.get('orderID', sell_resp))),
+                    ])
                 remaining = 0
 
             # partial fill
@@ -249,9 +401,9 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
                 logging.getLogger(__name__).info("Partial fill: %.4f filled, %.4f remains", sold, remaining - sold)
                 oid_buy  = buy_resp.get('orderID')  if isinstance(buy_resp, dict)  else buy_resp
                 oid_sell = sell_resp.get('orderID') if isinstance(sell_resp, dict) else sell_resp
-                buyer['client'].cancel(oid_buy)
-                seller['client'].cancel(oid_sell)
-                remaining -= sold
+                cancel_if_open(buyer['client'], oid_buy)
+                cancel_if_open(seller['client'], oid_sell)
+                remaining -= sold  # new size: the next attempt signs the remainder itself
                 attempt += 1
                 continue
 
@@ -261,8 +413,7 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
                 logging.getLogger(__name__).warning("Misfill/divert: sold %.4f, bought %.4f", sold, bought)
                 # give on-chain a moment and re-check
                 time.sleep(2)
-                re_seller = get_yes_position_volume(seller['wallet_address'], condition_id)
-                re_buyer = get_yes_position_volume(buyer['wallet_address'], condition_id)
+                re_seller, re_buyer = get_yes_position_volumes(pair, condition_id)
                 re_sold = start_seller - re_seller
                 re_bought = re_buyer - start_buyer
                 logging.getLogger(__name__).info(
@@ -281,9 +432,7 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
                     best_bid, _ = fetch_nbbo(token_id)
                     if post_seller > 0 and best_bid:
                         div_args = OrderArgs(price=best_bid, size=post_seller, side="SELL", token_id=token_id)
-                        div_resp = seller['client'].post_order(
-                            seller['client'].create_order(div_args), orderType=OrderType.GTC
-                        )
+                        div_resp = place_orders((seller, div_args))[0]
                         logging.getLogger(__name__).info("Divert: market sell of diverted shares @ %.4f: %s", best_bid, div_resp)
                     # continue with remaining chain
                     break
@@ -291,7 +440,7 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
                 # Misfill: seller sold but buyer got nothing
                 if sold >= remaining and bought == 0:
                     logging.getLogger(__name__).warning("Misfill: seller sold but buyer got none; restarting initial buy")
-                    buyer['client'].cancel(buy_resp.get('orderID') if isinstance(buy_resp, dict) else buy_resp)
+                    cancel_if_open(buyer['client'], buy_resp.get('orderID') if isinstance(buy_resp, dict) else buy_resp)
                     return chain_trade(
                         group, condition_id, token_id, initial_size, buy_price, mid_price,
                         skip_initial_buy=False, db_manager=db_manager, session_uuid=session_uuid
@@ -300,8 +449,11 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
                 # For any other weirdness: cancel and retry match
                 oid_buy  = buy_resp.get('orderID')  if isinstance(buy_resp, dict)  else buy_resp
                 oid_sell = sell_resp.get('orderID') if isinstance(sell_resp, dict) else sell_resp
-                buyer['client'].cancel(oid_buy)
-                seller['client'].cancel(oid_sell)
+                # a same-size retry needs fresh signatures (a cancelled order hash cannot be reposted);
+                # start signing them while the cancels go out
+                presigned = presign_orders((seller, sell_args), (buyer, buy_args))
+                cancel_if_open(buyer['client'], oid_buy)
+                cancel_if_open(seller['client'], oid_sell)
                 logging.getLogger(__name__).warning("Unexpected state; retrying remainder %.4f", remaining)
                 continue
         # end while
@@ -312,41 +464,18 @@ def chain_trade(group: List[Dict], condition_id: str, token_id: str, initial_siz
 
 # --- Main execution ---
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Chain-trade across N wallets from a CSV."
-    )
-    parser.add_argument(
-        "--wallets", required=True,
-        help="Path to CSV file of wallets (private_key,funder)"
-    )
-    parser.add_argument(
-        "--condition", required=True,
-        help="Polymarket condition_id"
-    )
-    parser.add_argument(
-        "--iterations", type=int, default=1,
-        help="Number of 5-wallet chains after the first 6-wallet run"
-    )
-    parser.add_argument(
-        "--volume", type=int, default=5,
-        help="Trade size (number of shares/contracts) per order"
-    )
-    parser.add_argument(
-        "--db-path", default=None,
-        help="Path to SQLite database file"
-    )
-    args = parser.parse_args()
+def run_cross_fill(condition_id: str, wallets_csv: str, db_path: Optional[str] = None,
+                   volume: int = 5, iterations: int = 1) -> str:
+    """Run one chain-trading session on `condition_id` and return its session UUID.
 
+    This is the body of the CLI, callable in-process (e.g. from `cross_fill_runner`).
+    """
     settings = load_settings()
-    configure_logging(settings.log_level)
-
-    db_path = args.db_path or settings.db_path
-    db_manager = DatabaseManager(db_path)
+    db_manager = DatabaseManager(db_path or settings.db_path)
     db_manager.log_message("Trading session started", "INFO")
         
     try:
-        wallet_entries = load_wallets(args.wallets, db_manager)
+        wallet_entries = load_wallets(wallets_csv, db_manager)
         clients = []
         for idx, w in enumerate(wallet_entries):
             pk = w['private_key']
@@ -365,26 +494,31 @@ def main() -> None:
             raise RuntimeError("Need at least 5 wallets for the first iteration")
 
         # Fetch token & NBBO
-        token_id = get_prices_and_tokens(args.condition, "yes", db_manager)
-        best_bid, best_ask = fetch_nbbo(token_id)
-        if best_bid is None or best_ask is None:
-            raise RuntimeError("Could not fetch NBBO bid/ask")
+        token_id = (db_manager.get_token_id(condition_id, "yes")
+                    or get_prices_and_tokens(condition_id, "yes", db_manager))
+        recent = db_manager.get_recent_market_data(token_id, NBBO_MAX_AGE_SEC)
+        if recent:
+            best_bid, best_ask = recent['best_bid'], recent['best_ask']
+        else:
+            best_bid, best_ask = fetch_nbbo(token_id)
+            if best_bid is None or best_ask is None:
+                raise RuntimeError("Could not fetch NBBO bid/ask")
 
-        # Save market data to database
-        db_manager.save_market_data(token_id, best_bid, best_ask)
+            # Save market data to database
+            db_manager.save_market_data(token_id, best_bid, best_ask)
         db_manager.log_message(f"Market data: bid={best_bid:.4f}, ask={best_ask:.4f}", "INFO")
 
         # Use CLI volume
-        size      = args.volume
+        size      = volume
         buy_price = best_ask
         mid_price = (best_ask + best_bid) / 2
 
         # Create trading session in database
         session_uuid = db_manager.create_session(
-            condition_id=args.condition,
+            condition_id=condition_id,
             token_id=token_id,
-            volume=args.volume,
-            iterations=args.iterations,
+            volume=volume,
+            iterations=iterations,
             initial_wallet_count=len(clients)
         )
         db_manager.log_message(f"Created trading session {session_uuid}", "INFO", session_uuid)
@@ -398,13 +532,13 @@ def main() -> None:
             iteration_number=0,
             group=initial_group,
             mark_initial=True,
-            mark_final=(args.iterations == 0)
+            mark_final=(iterations == 0)
         )
         last_group = initial_group
         last_iter_no = 0
 
         chain_trade(
-            initial_group, args.condition, token_id, size,
+            initial_group, condition_id, token_id, size,
             buy_price, mid_price,
             skip_initial_buy=False,
             db_manager=db_manager,
@@ -413,7 +547,7 @@ def main() -> None:
         last_wallet_obj = initial_group[-1]
 
         # Subsequent chains
-        for iter_no in range(1, args.iterations + 1):
+        for iter_no in range(1, iterations + 1):
             pool       = [c for c in clients if c['id'] != last_wallet_obj['id']]
             next_group = random.sample(pool, k=4)
             group      = [last_wallet_obj] + next_group
@@ -425,11 +559,11 @@ def main() -> None:
                 iteration_number=iter_no,
                 group=group,
                 mark_initial=False,
-                mark_final=(iter_no == args.iterations)  # last loop → flag final seller
+                mark_final=(iter_no == iterations)  # last loop → flag final seller
             )
 
             chain_trade(
-                group, args.condition, token_id, size,
+                group, condition_id, token_id, size,
                 buy_price, mid_price,
                 skip_initial_buy=True,
                 db_manager=db_manager,
@@ -471,6 +605,11 @@ def main() -> None:
         # Mark session as completed
         db_manager.update_session_status(session_uuid, "completed", datetime.now())
         db_manager.log_message("Trading session completed successfully", "INFO", session_uuid)
+        try:
+            db_manager.optimize()
+        except sqlite3.Error as exc:
+            logging.getLogger(__name__).warning("Post-session optimize failed: %s", exc)
+        return session_uuid
 
     except Exception as exc:
         db_manager.log_message(f"Trading session failed: {str(exc)}", "ERROR")
@@ -478,6 +617,51 @@ def main() -> None:
             db_manager.update_session_status(session_uuid, "failed", datetime.now())
         raise
 
+    finally:
+        try:
+            db_manager.close()
+        except sqlite3.Error as exc:
+            # never mask the session's own outcome; connections are released regardless
+            logging.getLogger(__name__).warning("Could not flush session logs on close: %s", exc)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Chain-trade across N wallets from a CSV."
+    )
+    parser.add_argument(
+        "--wallets", required=True,
+        help="Path to CSV file of wallets (private_key,funder)"
+    )
+    parser.add_argument(
+        "--condition", required=True,
+        help="Polymarket condition_id"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=1,
+        help="Number of 5-wallet chains after the first 6-wallet run"
+    )
+    parser.add_argument(
+        "--volume", type=int, default=5,
+        help="Trade size (number of shares/contracts) per order"
+    )
+    parser.add_argument(
+        "--db-path", default=None,
+        help="Path to SQLite database file"
+    )
+    args = parser.parse_args()
+
+    settings = load_settings()
+    configure_logging(settings.log_level)
+
+    run_cross_fill(
+        condition_id=args.condition,
+        wallets_csv=args.wallets,
+        db_path=args.db_path,
+        volume=args.volume,
+        iterations=args.iterations,
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -2,49 +2,64 @@
 import argparse
 import concurrent.futures
 import logging
-import os
 import subprocess
-from typing import List
-
-import requests
+from pathlib import Path
+from typing import Dict, List, Tuple
 
+from cross_fill import run_cross_fill
+from http_session import build_session, json_body
 from logging_config import configure_logging
 from settings import load_settings
 
+# Shared keep-alive session for the market status fan-out
+_SESSION = build_session(pool_maxsize=32)
+# condition_id -> (ETag, active flag) so rechecks after a regeneration can be answered with a 304
+_MARKET_ETAGS: Dict[str, Tuple[str, bool]] = {}
+
 
 def is_market_active(condition_id: str, timeout: float) -> bool:
     """Return True if a market is active and accepting orders."""
     try:
         url = f"https://clob.polymarket.com/markets/{condition_id}"
-        resp = requests.get(url, timeout=timeout)
+        cached = _MARKET_ETAGS.get(condition_id)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        resp = _SESSION.get(url, timeout=timeout, headers=headers)
+        if resp.status_code == 304 and cached:
+            return cached[1]
         resp.raise_for_status()
-        data = resp.json()
-        return bool(
+        data = json_body(resp)
+        active = bool(
             data.get("active", False)
             and not data.get("closed", True)
             and data.get("accepting_orders", False)
         )
+        etag = resp.headers.get("ETag")
+        if etag:
+            _MARKET_ETAGS[condition_id] = (etag, active)
+        return active
     except Exception as exc:
         logging.getLogger(__name__).warning("Could not verify market %s: %s", condition_id, exc)
         return False
 
 
-def get_active_markets_from_file(filepath: str, timeout: float) -> List[str]:
-    active: List[str] = []
-    if not os.path.exists(filepath):
-        return active
-    with open(filepath, encoding="utf-8") as f:
-        for line in f:
-            cid = line.strip().split()[0]
-            if cid and is_market_active(cid, timeout):
-                active.append(cid)
-    return active
+def get_active_markets_from_file(filepath: str, timeout: float, max_workers: int = 32) -> List[str]:
+    """Return condition_ids from `filepath` whose markets are active, checked concurrently."""
+    path = Path(filepath)
+    if not path.is_file():
+        return []
+    cids = [line.split()[0] for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    if not cids:
+        return []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(max_workers, len(cids))) as executor:
+        flags = executor.map(lambda cid: is_market_active(cid, timeout), cids)
+        return [cid for cid, active in zip(cids, flags) if active]
 
 
 def regenerate_cheap_markets() -> bool:
     logging.getLogger(__name__).info("Regenerating cheap_markets.txt")
     try:
-        subprocess.run(["python", "market_scan.py"], check=True)
+        # the current list is stale, so the scan must not be answered from its cache
+        subprocess.run(["python", "market_scan.py", "--no-cache"], check=True)
         return True
     except subprocess.CalledProcessError as exc:
         logging.getLogger(__name__).error("market_scan.py failed: %s", exc)
@@ -52,15 +67,14 @@ def regenerate_cheap_markets() -> bool:
 
 
 def cross_fill_for(condition_id: str, wallets_csv: str, db_path: str) -> str:
-    """Run cross_fill.py for one market and return the condition_id on success."""
-    subprocess.run([
-        "python", "cross_fill.py",
-        "--wallets", wallets_csv,
-        "--condition", condition_id,
-        "--volume", "5",
-        "--iterations", "2",
-        "--db-path", db_path,
-    ], check=True)
+    """Run a cross fill for one market and return the condition_id on success."""
+    run_cross_fill(
+        condition_id=condition_id,
+        wallets_csv=wallets_csv,
+        db_path=db_path,
+        volume=5,
+        iterations=2,
+    )
     return condition_id
 
 
@@ -80,7 +94,9 @@ def main() -> None:
     active_markets: List[str] = []
 
     while retries <= max_retries:
-        active_markets = get_active_markets_from_file(settings.cheap_markets_file, settings.http_timeout_sec)
+        active_markets = get_active_markets_from_file(
+            settings.cheap_markets_file, settings.http_timeout_sec, settings.scan_workers
+        )
         if len(active_markets) < min_active:
             logging.getLogger(__name__).info("Only %d active markets — regenerating.", len(active_markets))
             if not regenerate_cheap_markets():
@@ -96,7 +112,8 @@ def main() -> None:
     logging.getLogger(__name__).info("Launching cross-fills for %d markets in parallel", len(active_markets))
     max_workers = min(settings.max_workers, len(active_markets))
 
-    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+    # each fill spends nearly all its time waiting on HTTPS; threads avoid an interpreter per market
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fill") as executor:
         futures = {
             executor.submit(cross_fill_for, cid, settings.wallets_csv, settings.db_path): cid
             for cid in active_markets
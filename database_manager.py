@@ -1,41 +1,306 @@
+import atexit
 import sqlite3
 import hashlib
 import uuid
 import json
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple, Iterator
+import queue
+import threading
+import weakref
+from datetime import datetime, timezone
+from typing import Callable, List, Dict, Optional, Tuple, Iterator
 from contextlib import contextmanager
+from pathlib import Path
 
 from logging_config import configure_logging
 from settings import load_settings
 
+try:  # optional faster encoder for log details
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json
+    orjson = None
+
+
+# Hot-path statements as module constants: the sqlite3 statement cache is keyed by SQL text,
+# so every call reuses the same compiled statement on the long-lived connections
+_SQL_SESSION_BY_UUID = "SELECT * FROM trading_sessions WHERE session_uuid = ?"
+_SQL_SESSION_ID_BY_UUID = "SELECT id FROM trading_sessions WHERE session_uuid = ?"
+_SQL_INSERT_TRADE = """INSERT INTO trades
+    (session_id, wallet_id, token_id, order_id, side, price, size, trade_type)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+_SQL_TRADE_VALUES = ",\n    (?, ?, ?, ?, ?, ?, ?, ?)"
+# INSERT ... RETURNING (SQLite 3.35+) hands back inserted ids, including for multi-row inserts
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+_SQL_FILL_TRADE = """UPDATE trades
+    SET status = ?, fill_price = ?, fill_size = ?, fees = ?, filled_at = CURRENT_TIMESTAMP
+    WHERE id = ?"""
+_SQL_UPDATE_TRADE_STATUS = "UPDATE trades SET status = ? WHERE id = ?"
+_SQL_INSERT_MARKET_DATA = """INSERT INTO market_data (token_id, session_id, best_bid, best_ask, spread, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+_SQL_INSERT_LOG = """INSERT INTO app_logs (session_id, log_level, message, details, timestamp)
+    VALUES (?, ?, ?, ?, ?)"""
+# Trade aggregates are kept on the session and wallet rows by the trades_counters_* triggers
+_SQL_SESSION_SUMMARY = """SELECT
+    ts.*,
+    CASE WHEN ts.total_trades > 0 THEN ts.price_sum / ts.total_trades END as avg_price
+FROM trading_sessions ts
+WHERE ts.session_uuid = ?"""
+_SQL_WALLET_PERFORMANCE = """SELECT
+    w.*,
+    CASE WHEN w.total_trades > 0 THEN w.price_sum / w.total_trades END as avg_price
+FROM wallets w"""
+_SQL_SESSION_TRADES = """SELECT t.*, w.nickname, w.wallet_index
+FROM trades t
+JOIN wallets w ON t.wallet_id = w.id
+WHERE t.session_id = ?
+ORDER BY t.timestamp"""
+_SQL_INSERT_CHAIN_STEP = """INSERT INTO chain_sequences
+    (session_id, iteration_number, sequence_order, wallet_id, is_initial_buy, is_final_sell)
+    VALUES (?, ?, ?, ?, ?, ?)"""
+
+
+# Managers with rows possibly still buffered; flushed once more when the interpreter exits
+_LIVE_MANAGERS: "weakref.WeakSet[DatabaseManager]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_managers() -> None:
+    for manager in list(_LIVE_MANAGERS):
+        manager._timed_flush()
+
+
+def _dumps(value: object) -> str:
+    """JSON-encode `value` as text, with orjson when installed (compact separators)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # let json.dumps handle what orjson rejects (e.g. ints beyond 64 bits)
+    return json.dumps(value)
+
+
+def _utc_now() -> str:
+    """Timestamp in SQLite's CURRENT_TIMESTAMP format, taken when a row is buffered."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
 
 class DatabaseManager:
     """SQLite-backed persistence layer for sessions, trades, wallets and logs."""
 
+    READ_POOL_SIZE = 4
+    CACHED_STATEMENTS = 256
+    WAL_AUTOCHECKPOINT_PAGES = 10000
+    # Buffered log/market-data rows are written once BATCH_SIZE rows are waiting, or by a
+    # timer FLUSH_INTERVAL_SEC after the first one
+    BATCH_SIZE = 50
+    FLUSH_INTERVAL_SEC = 1.0
+
     def __init__(self, db_path: str = "polyfarm.db"):
         self.db_path = db_path
         self.logger = logging.getLogger(self.__class__.__name__)
+        # One connection per manager, opened lazily and shared by every call; the lock
+        # keeps threads (e.g. the runner's fill pool) from interleaving transactions
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        # Read-only connections for queries, so readers never wait on the writer lock
+        self._readers: "queue.Queue[sqlite3.Connection]" = queue.Queue(maxsize=self.READ_POOL_SIZE)
+        # SQL -> rows waiting for flush(); guarded by the writer lock
+        self._pending: Dict[str, List[Tuple]] = {}
+        self._pending_count = 0
+        # fires FLUSH_INTERVAL_SEC after the first buffered row; holds the manager alive until then
+        self._flush_timer: Optional[threading.Timer] = None
+        # session_uuid -> trading_sessions.id; ids never change once assigned
+        self._session_ids: Dict[str, int] = {}
+        # setting_key -> value (None when unset); only set_setting writes through this process
+        self._settings: Dict[str, Optional[str]] = {}
+        self._settings_lock = threading.Lock()
         self.init_database()
     
     def init_database(self) -> None:
         """Initialize the database with the schema if not present."""
         with sqlite3.connect(self.db_path) as conn:
+            if self.db_path != ":memory:":
+                # WAL is persistent in the file: readers stop blocking the writer and
+                # commits need one fsync instead of two
+                try:
+                    conn.execute("PRAGMA journal_mode = WAL")
+                except sqlite3.OperationalError as exc:
+                    # read-only file or directory: keep whatever journal mode it already has
+                    self.logger.warning("Could not enable WAL on %s: %s", self.db_path, exc)
             cursor = conn.execute(
                 "SELECT name FROM sqlite_master WHERE type='table' AND name='wallets'"
             )
-            if cursor.fetchone():
-                conn.execute("PRAGMA foreign_keys = ON")
-                return
-            
+            if not cursor.fetchone():
+                try:
+                    conn.executescript(Path('database_schema.sql').read_text())
+                except FileNotFoundError:
+                    self.logger.warning("database_schema.sql not found. Creating basic schema.")
+                    self._create_basic_schema(conn)
+            self._ensure_indexes(conn)
+            self._ensure_trade_counters(conn)
+    
+    # Indexes behind the session/wallet reports and per-session log and market-data lookups.
+    # Created IF NOT EXISTS on every start so databases made by older schemas pick them up.
+    _INDEXES = (
+        "CREATE INDEX IF NOT EXISTS idx_trades_session_id ON trades(session_id)",
+        "CREATE INDEX IF NOT EXISTS idx_trades_wallet_id ON trades(wallet_id)",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_sessions_uuid ON trading_sessions(session_uuid)",
+        "CREATE INDEX IF NOT EXISTS idx_app_logs_session_ts ON app_logs(session_id, timestamp DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_market_data_token_ts ON market_data(token_id, timestamp DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_app_logs_timestamp ON app_logs(timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_app_logs_level_ts ON app_logs(log_level, timestamp DESC)",
+    )
+    
+    # Per-session and per-wallet trade aggregates, maintained by triggers on trades so the
+    # summaries read one row instead of grouping every trade
+    _COUNTER_COLUMNS = {
+        "trading_sessions": (
+            ("total_trades", "INTEGER DEFAULT 0"),
+            ("filled_volume", "REAL DEFAULT 0.0"),
+            ("total_fees", "REAL DEFAULT 0.0"),
+            ("price_sum", "REAL DEFAULT 0.0"),
+        ),
+        "wallets": (
+            ("total_trades", "INTEGER DEFAULT 0"),
+            ("total_volume", "REAL DEFAULT 0.0"),
+            ("total_fees", "REAL DEFAULT 0.0"),
+            ("price_sum", "REAL DEFAULT 0.0"),
+            ("last_trade_time", "TIMESTAMP"),
+        ),
+    }
+    
+    _COUNTER_TRIGGERS = (
+        """CREATE TRIGGER IF NOT EXISTS trades_counters_insert AFTER INSERT ON trades
+        BEGIN
+            UPDATE trading_sessions SET
+                total_trades = total_trades + 1,
+                filled_volume = filled_volume + (CASE WHEN NEW.status = 'filled' THEN NEW.size ELSE 0 END),
+                total_fees = total_fees + COALESCE(NEW.fees, 0),
+                price_sum = price_sum + NEW.price
+            WHERE id = NEW.session_id;
+            UPDATE wallets SET
+                total_trades = total_trades + 1,
+                total_volume = total_volume + (CASE WHEN NEW.status = 'filled' THEN NEW.size ELSE 0 END),
+                total_fees = total_fees + COALESCE(NEW.fees, 0),
+                price_sum = price_sum + NEW.price,
+                last_trade_time = MAX(COALESCE(last_trade_time, NEW.timestamp), NEW.timestamp)
+            WHERE id = NEW.wallet_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trades_counters_update
+        AFTER UPDATE OF session_id, wallet_id, status, size, fees, price ON trades
+        BEGIN
+            UPDATE trading_sessions SET
+                filled_volume = filled_volume - (CASE WHEN OLD.status = 'filled' THEN OLD.size ELSE 0 END),
+                total_fees = total_fees - COALESCE(OLD.fees, 0),
+                price_sum = price_sum - OLD.price,
+                total_trades = total_trades - 1
+            WHERE id = OLD.session_id;
+            UPDATE trading_sessions SET
+                filled_volume = filled_volume + (CASE WHEN NEW.status = 'filled' THEN NEW.size ELSE 0 END),
+                total_fees = total_fees + COALESCE(NEW.fees, 0),
+                price_sum = price_sum + NEW.price,
+                total_trades = total_trades + 1
+            WHERE id = NEW.session_id;
+            UPDATE wallets SET
+                total_volume = total_volume - (CASE WHEN OLD.status = 'filled' THEN OLD.size ELSE 0 END),
+                total_fees = total_fees - COALESCE(OLD.fees, 0),
+                price_sum = price_sum - OLD.price,
+                total_trades = total_trades - 1
+            WHERE id = OLD.wallet_id;
+            UPDATE wallets SET
+                total_volume = total_volume + (CASE WHEN NEW.status = 'filled' THEN NEW.size ELSE 0 END),
+                total_fees = total_fees + COALESCE(NEW.fees, 0),
+                price_sum = price_sum + NEW.price,
+                total_trades = total_trades + 1
+            WHERE id = NEW.wallet_id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS trades_counters_delete AFTER DELETE ON trades
+        BEGIN
+            UPDATE trading_sessions SET
+                total_trades = total_trades - 1,
+                filled_volume = filled_volume - (CASE WHEN OLD.status = 'filled' THEN OLD.size ELSE 0 END),
+                total_fees = total_fees - COALESCE(OLD.fees, 0),
+                price_sum = price_sum - OLD.price
+            WHERE id = OLD.session_id;
+            UPDATE wallets SET
+                total_trades = total_trades - 1,
+                total_volume = total_volume - (CASE WHEN OLD.status = 'filled' THEN OLD.size ELSE 0 END),
+                total_fees = total_fees - COALESCE(OLD.fees, 0),
+                price_sum = price_sum - OLD.price,
+                last_trade_time = (SELECT MAX(timestamp) FROM trades WHERE wallet_id = OLD.wallet_id)
+            WHERE id = OLD.wallet_id;
+        END""",
+    )
+    
+    # Views that aggregated trades on every read; rebuilt on top of the counters when migrating
+    _COUNTER_VIEWS = (
+        "DROP VIEW IF EXISTS v_active_sessions",
+        """CREATE VIEW v_active_sessions AS
+        SELECT ts.*, mc.title as market_title, mc.description as market_description,
+               ts.total_trades as trade_count
+        FROM trading_sessions ts
+        LEFT JOIN market_conditions mc ON ts.condition_id = mc.condition_id
+        WHERE ts.status IN ('running', 'completed')""",
+        "DROP VIEW IF EXISTS v_wallet_summary",
+        "CREATE VIEW v_wallet_summary AS SELECT w.* FROM wallets w WHERE w.is_active = TRUE",
+    )
+    
+    def _ensure_trade_counters(self, conn: sqlite3.Connection) -> None:
+        """Add and backfill the counter columns on older databases, then install the triggers.
+
+        Everything runs in one explicit transaction (ALTER TABLE would otherwise autocommit),
+        and the triggers are created last: a database without them has never been backfilled.
+        """
+        trade_columns = {row[1] for row in conn.execute("PRAGMA table_info(trades)")}
+        if "fees" not in trade_columns:
+            return  # basic fallback schema: no fee/status data to aggregate
+        installed = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trades_counters_insert'"
+        ).fetchone()
+        if installed:
+            return
+        if conn.in_transaction:
+            conn.commit()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for table, columns in self._COUNTER_COLUMNS.items():
+                    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                    for name, decl in columns:
+                        if name not in existing:
+                            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+                self.logger.info("Backfilling trade counters on %s", self.db_path)
+                for table, key in (("trading_sessions", "session_id"), ("wallets", "wallet_id")):
+                    volume = "filled_volume" if table == "trading_sessions" else "total_volume"
+                    conn.execute(
+                        f"""UPDATE {table} SET
+                            total_trades = (SELECT COUNT(*) FROM trades t WHERE t.{key} = {table}.id),
+                            {volume} = (SELECT COALESCE(SUM(CASE WHEN t.status = 'filled' THEN t.size ELSE 0 END), 0)
+                                        FROM trades t WHERE t.{key} = {table}.id),
+                            total_fees = (SELECT COALESCE(SUM(t.fees), 0) FROM trades t WHERE t.{key} = {table}.id),
+                            price_sum = (SELECT COALESCE(SUM(t.price), 0) FROM trades t WHERE t.{key} = {table}.id)"""
+                    )
+                conn.execute(
+                    """UPDATE wallets SET last_trade_time =
+                       (SELECT MAX(t.timestamp) FROM trades t WHERE t.wallet_id = wallets.id)"""
+                )
+                for statement in self._COUNTER_VIEWS + self._COUNTER_TRIGGERS:
+                    conn.execute(statement)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        except sqlite3.OperationalError as exc:
+            # e.g. locked by another starting process; retried on the next start
+            self.logger.warning("Could not install trade counters on %s: %s", self.db_path, exc)
+    
+    def _ensure_indexes(self, conn: sqlite3.Connection) -> None:
+        for statement in self._INDEXES:
             try:
-                with open('database_schema.sql', 'r') as f:
-                    schema = f.read()
-                    conn.executescript(schema)
-            except FileNotFoundError:
-                self.logger.warning("database_schema.sql not found. Creating basic schema.")
-                self._create_basic_schema(conn)
+                conn.execute(statement)
+            except sqlite3.OperationalError as exc:
+                # table missing from the basic schema, or a read-only database
+                self.logger.debug("Skipped index (%s): %s", exc, statement)
     
     def _create_basic_schema(self, conn: sqlite3.Connection) -> None:
         """Create basic schema if schema file is not found."""
@@ -77,37 +342,190 @@ class DatabaseManager:
             )
         """)
     
+    @staticmethod
+    def _configure_connection(conn: sqlite3.Connection, read_only: bool = False) -> None:
+        """Apply per-connection PRAGMAs; journal_mode is persistent and set once in init_database.
+
+        Readers never modify rows, so they skip the write-only foreign_keys and synchronous settings.
+        """
+        conn.row_factory = sqlite3.Row
+        if not read_only:
+            conn.execute("PRAGMA foreign_keys = ON")
+            # NORMAL is durable under WAL except for the last commits on power loss
+            conn.execute("PRAGMA synchronous = NORMAL")
+            # checkpoint less often than the 1000-page default; optimize() truncates the WAL when idle
+            conn.execute(f"PRAGMA wal_autocheckpoint = {DatabaseManager.WAL_AUTOCHECKPOINT_PAGES}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA cache_size = -64000")  # ~64 MB page cache
+        conn.execute("PRAGMA mmap_size = 268435456")
+
+    def _connect(self, read_only: bool = False) -> sqlite3.Connection:
+        if read_only:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            conn = sqlite3.connect(uri, timeout=5.0, check_same_thread=False, uri=True,
+                                   cached_statements=self.CACHED_STATEMENTS)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False,
+                                   cached_statements=self.CACHED_STATEMENTS)
+        self._configure_connection(conn, read_only)
+        return conn
+
     @contextmanager
     def get_connection(self) -> Iterator[sqlite3.Connection]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            try:
+                yield self._conn
+            finally:
+                # match the old close-per-call behaviour: uncommitted work is discarded
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+
+    @contextmanager
+    def get_read_connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a pooled read-only connection (the writer for in-memory databases)."""
+        if self.db_path == ":memory:":
+            with self.get_connection() as conn:
+                yield conn
+            return
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect(read_only=True)
         try:
             yield conn
         finally:
-            conn.close()
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _buffer(self, sql: str, row: Tuple) -> None:
+        with self._lock:
+            self._pending.setdefault(sql, []).append(row)
+            self._pending_count += 1
+            if self._pending_count >= self.BATCH_SIZE:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.FLUSH_INTERVAL_SEC, self._timed_flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+                _LIVE_MANAGERS.add(self)
+
+    def _timed_flush(self) -> None:
+        """flush() for the timer and exit hook, where there is no caller to raise to."""
+        try:
+            self.flush()
+        except sqlite3.Error as exc:
+            self.logger.warning("Background flush to %s failed: %s", self.db_path, exc)
+
+    def flush(self) -> None:
+        """Write buffered log and market-data rows in a single transaction."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending_count:
+                return
+            pending, self._pending, self._pending_count = self._pending, {}, 0
+            with self.get_connection() as conn:
+                try:
+                    with conn:
+                        for sql, rows in pending.items():
+                            conn.executemany(sql, rows)
+                except sqlite3.IntegrityError:
+                    # keep the good rows: retry one by one and drop only the offenders
+                    for sql, rows in pending.items():
+                        for i, row in enumerate(rows):
+                            try:
+                                with conn:
+                                    conn.execute(sql, row)
+                            except sqlite3.IntegrityError as exc:
+                                self.logger.warning("Dropped buffered row %r: %s", row, exc)
+                            except sqlite3.Error:
+                                rows[:i] = []
+                                self._requeue(pending)
+                                raise
+                        pending[sql] = []
+                except sqlite3.Error:
+                    # e.g. locked past the busy timeout: keep every row for the next flush/close
+                    self._requeue(pending)
+                    raise
+
+    def _requeue(self, pending: Dict[str, List[Tuple]]) -> None:
+        """Put unwritten rows back ahead of anything buffered since; caller holds the lock."""
+        merged = {sql: rows + self._pending.pop(sql, []) for sql, rows in pending.items() if rows}
+        merged.update(self._pending)
+        self._pending = merged
+        self._pending_count = sum(len(rows) for rows in merged.values())
+
+    def close(self) -> None:
+        """Flush buffered rows, then close the writer and pooled readers; the next call reopens them."""
+        try:
+            self.flush()
+        finally:
+            with self._lock:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+            while True:
+                try:
+                    self._readers.get_nowait().close()
+                except queue.Empty:
+                    break
     
     def add_wallet(self, wallet_index: int, private_key: str, funder_address: str, nickname: Optional[str] = None) -> int:
         private_key_hash = hashlib.sha256(private_key.encode()).hexdigest()
         
+        sql = """INSERT INTO wallets (wallet_index, private_key_hash, funder_address, nickname)
+                 VALUES (?, ?, ?, ?)"""
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                """INSERT INTO wallets (wallet_index, private_key_hash, funder_address, nickname)
-                   VALUES (?, ?, ?, ?)""",
-                (wallet_index, private_key_hash, funder_address, nickname)
-            )
+            if _HAS_RETURNING:
+                # read the id before commit: the statement must finish stepping first
+                wallet_id = conn.execute(sql + " RETURNING id",
+                                         (wallet_index, private_key_hash, funder_address, nickname)).fetchone()[0]
+            else:
+                wallet_id = conn.execute(sql, (wallet_index, private_key_hash, funder_address, nickname)).lastrowid
             conn.commit()
-            return cursor.lastrowid
+            return wallet_id
     
-    def get_wallets(self, active_only: bool = True) -> List[Dict]:
+    def add_wallets_bulk(self, rows: List[Tuple[int, str, str, Optional[str]]]) -> Dict[int, int]:
+        """Insert wallets not stored yet in one transaction and return wallet_index -> id for all rows.
+
+        rows format: (wallet_index, private_key, funder_address, nickname); existing
+        wallet_index values are left untouched.
+        """
+        if not rows:
+            return {}
         with self.get_connection() as conn:
+            with conn:
+                conn.executemany(
+                    """INSERT OR IGNORE INTO wallets (wallet_index, private_key_hash, funder_address, nickname)
+                       VALUES (?, ?, ?, ?)""",
+                    [
+                        (idx, hashlib.sha256(pk.encode()).hexdigest(), funder, nickname)
+                        for idx, pk, funder, nickname in rows
+                    ],
+                )
+            indexes = [row[0] for row in rows]
+            cursor = conn.execute(
+                f"SELECT id, wallet_index FROM wallets WHERE wallet_index IN ({','.join('?' * len(indexes))})",
+                indexes,
+            )
+            return {row['wallet_index']: row['id'] for row in cursor}
+    
+    def get_wallets(self, active_only: bool = True) -> List[sqlite3.Row]:
+        with self.get_read_connection() as conn:
             query = "SELECT * FROM wallets"
             if active_only:
                 query += " WHERE is_active = TRUE"
             query += " ORDER BY wallet_index"
             
             cursor = conn.execute(query)
-            return [dict(row) for row in cursor.fetchall()]
+            return cursor.fetchall()
     
     def deactivate_wallet(self, wallet_id: int) -> None:
         with self.get_connection() as conn:
@@ -116,71 +534,104 @@ class DatabaseManager:
     
     def create_session(self, condition_id: str, token_id: str, volume: int, iterations: int, 
                       initial_wallet_count: int) -> str:
-        session_uuid = str(uuid.uuid4())
+        session_uuid = uuid.uuid4().hex  # 32 hex chars; no hyphen formatting
         
         with self.get_connection() as conn:
-            conn.execute(
+            cursor = conn.execute(
                 """INSERT INTO trading_sessions 
                    (session_uuid, condition_id, token_id, volume, iterations, initial_wallet_count)
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (session_uuid, condition_id, token_id, volume, iterations, initial_wallet_count)
             )
             conn.commit()
+        self._session_ids[session_uuid] = cursor.lastrowid
         
         return session_uuid
     
+    def get_session_id(self, session_uuid: str) -> Optional[int]:
+        """Return the integer id of a session, or None if the uuid is unknown."""
+        return self._resolve_session_id(session_uuid)
+    
+    def _resolve_session_id(self, session_uuid: str) -> Optional[int]:
+        """Return the integer id for `session_uuid`, querying only the first time it is seen."""
+        session_id = self._session_ids.get(session_uuid)
+        if session_id is None:
+            session_id = self._get_session_id(session_uuid)
+            if session_id is not None:
+                self._session_ids[session_uuid] = session_id
+        return session_id
+    
+    def _get_session_id(self, session_uuid: str) -> Optional[int]:
+        """Look up only the id column; callers that need the full row use get_session_by_uuid."""
+        with self.get_read_connection() as conn:
+            row = conn.execute(_SQL_SESSION_ID_BY_UUID, (session_uuid,)).fetchone()
+            return row[0] if row else None
+    
     def get_session_by_uuid(self, session_uuid: str) -> Optional[Dict]:
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.execute(
-                "SELECT * FROM trading_sessions WHERE session_uuid = ?",
+                _SQL_SESSION_BY_UUID,
                 (session_uuid,)
             )
             row = cursor.fetchone()
             return dict(row) if row else None
     
     def update_session_status(self, session_uuid: str, status: str, end_time: Optional[datetime] = None) -> None:
+        session_id = self._resolve_session_id(session_uuid)
+        if session_id is None:
+            return
         with self.get_connection() as conn:
             if end_time:
                 conn.execute(
-                    "UPDATE trading_sessions SET status = ?, end_time = ? WHERE session_uuid = ?",
-                    (status, end_time, session_uuid)
+                    "UPDATE trading_sessions SET status = ?, end_time = ? WHERE id = ?",
+                    (status, end_time, session_id)
                 )
             else:
                 conn.execute(
-                    "UPDATE trading_sessions SET status = ? WHERE session_uuid = ?",
-                    (status, session_uuid)
+                    "UPDATE trading_sessions SET status = ? WHERE id = ?",
+                    (status, session_id)
                 )
             conn.commit()
     
     def log_trade(self, session_uuid: str, wallet_id: int, token_id: str, side: str, 
                  price: float, size: float, trade_type: str, order_id: Optional[str] = None) -> int:
-        session = self.get_session_by_uuid(session_uuid)
-        if not session:
+        return self.log_trades(session_uuid, [(wallet_id, token_id, side, price, size, trade_type, order_id)])[0]
+    
+    def log_trades(self, session_uuid: str,
+                   trades: List[Tuple[int, str, str, float, float, str, Optional[str]]]) -> List[int]:
+        """Insert several trades of one session in a single transaction and return their ids in order.
+
+        trades format: (wallet_id, token_id, side, price, size, trade_type, order_id)
+        """
+        session_id = self._resolve_session_id(session_uuid)
+        if session_id is None:
             raise ValueError(f"Session {session_uuid} not found")
+        rows = [
+            (session_id, wallet_id, token_id, order_id, side, price, size, trade_type)
+            for wallet_id, token_id, side, price, size, trade_type, order_id in trades
+        ]
         
         with self.get_connection() as conn:
-            cursor = conn.execute(
-                """INSERT INTO trades 
-                   (session_id, wallet_id, token_id, order_id, side, price, size, trade_type)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (session['id'], wallet_id, token_id, order_id, side, price, size, trade_type)
-            )
-            conn.commit()
-            return cursor.lastrowid
+            with conn:
+                if _HAS_RETURNING:
+                    # one multi-row INSERT; RETURNING order is unspecified but ids ascend with insert order
+                    sql = _SQL_INSERT_TRADE + _SQL_TRADE_VALUES * (len(rows) - 1) + " RETURNING id"
+                    ids = sorted(row[0] for row in conn.execute(sql, [v for row in rows for v in row]))
+                else:
+                    ids = [conn.execute(_SQL_INSERT_TRADE, row).lastrowid for row in rows]
+        return ids
     
     def update_trade_status(self, trade_id: int, status: str, fill_price: Optional[float] = None, 
                            fill_size: Optional[float] = None, fees: Optional[float] = None) -> None:
         with self.get_connection() as conn:
             if fill_price is not None and fill_size is not None:
                 conn.execute(
-                    """UPDATE trades 
-                       SET status = ?, fill_price = ?, fill_size = ?, fees = ?, filled_at = CURRENT_TIMESTAMP
-                       WHERE id = ?""",
+                    _SQL_FILL_TRADE,
                     (status, fill_price, fill_size, fees or 0.0, trade_id)
                 )
             else:
                 conn.execute(
-                    "UPDATE trades SET status = ? WHERE id = ?",
+                    _SQL_UPDATE_TRADE_STATUS,
                     (status, trade_id)
                 )
             conn.commit()
@@ -189,91 +640,103 @@ class DatabaseManager:
                         session_uuid: Optional[str] = None) -> None:
         session_id = None
         if session_uuid:
-            session = self.get_session_by_uuid(session_uuid)
-            session_id = session['id'] if session else None
+            session_id = self._resolve_session_id(session_uuid)
         
         spread = best_ask - best_bid if best_bid and best_ask else None
         
-        with self.get_connection() as conn:
-            conn.execute(
-                """INSERT INTO market_data (token_id, session_id, best_bid, best_ask, spread)
-                   VALUES (?, ?, ?, ?, ?)""",
-                (token_id, session_id, best_bid, best_ask, spread)
-            )
-            conn.commit()
+        self._buffer(_SQL_INSERT_MARKET_DATA, (token_id, session_id, best_bid, best_ask, spread, _utc_now()))
     
     def log_message(self, message: str, log_level: str = "INFO", session_uuid: Optional[str] = None, 
                    details: Optional[Dict] = None) -> None:
         session_id = None
         if session_uuid:
-            session = self.get_session_by_uuid(session_uuid)
-            session_id = session['id'] if session else None
+            session_id = self._resolve_session_id(session_uuid)
         
-        details_json = json.dumps(details) if details else None
+        details_json = _dumps(details) if details else None
         
-        with self.get_connection() as conn:
-            conn.execute(
-                """INSERT INTO app_logs (session_id, log_level, message, details)
-                   VALUES (?, ?, ?, ?)""",
-                (session_id, log_level, message, details_json)
+        self._buffer(_SQL_INSERT_LOG, (session_id, log_level, message, details_json, _utc_now()))
+    
+    def get_token_id(self, condition_id: str, outcome_side: str) -> Optional[str]:
+        """Return the stored token_id for a market outcome, or None if not cached yet."""
+        with self.get_read_connection() as conn:
+            cursor = conn.execute(
+                "SELECT token_id FROM tokens WHERE condition_id = ? AND outcome_side = ?",
+                (condition_id, outcome_side.lower())
             )
-            conn.commit()
+            row = cursor.fetchone()
+            return row['token_id'] if row else None
     
-    def get_session_summary(self, session_uuid: str) -> Dict:
-        with self.get_connection() as conn:
+    def get_recent_market_data(self, token_id: str, max_age_sec: float) -> Optional[Dict]:
+        """Return the newest market_data row for `token_id` if it is at most `max_age_sec` old."""
+        self.flush()
+        with self.get_read_connection() as conn:
             cursor = conn.execute(
-                """SELECT 
-                    ts.*,
-                    COUNT(t.id) as total_trades,
-                    SUM(CASE WHEN t.status = 'filled' THEN t.size ELSE 0 END) as filled_volume,
-                    SUM(t.fees) as total_fees,
-                    AVG(t.price) as avg_price
-                FROM trading_sessions ts
-                LEFT JOIN trades t ON ts.id = t.session_id
-                WHERE ts.session_uuid = ?
-                GROUP BY ts.id""",
-                (session_uuid,)
+                """SELECT * FROM market_data
+                   WHERE token_id = ? AND timestamp >= datetime('now', ?)
+                   ORDER BY timestamp DESC, id DESC
+                   LIMIT 1""",
+                (token_id, f"-{max_age_sec} seconds")
             )
             row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_session_summary(self, session_uuid: str) -> Dict:
+        with self.get_read_connection() as conn:
+            row = conn.execute(_SQL_SESSION_SUMMARY, (session_uuid,)).fetchone()
             return dict(row) if row else {}
     
+    def get_session_details(self, session_uuid: str) -> Tuple[Dict, List[sqlite3.Row]]:
+        """Return (summary, trades) for a session, read on one connection from one snapshot."""
+        with self.get_read_connection() as conn:
+            conn.execute("BEGIN")  # both queries see the same committed state
+            row = conn.execute(_SQL_SESSION_SUMMARY, (session_uuid,)).fetchone()
+            trades = conn.execute(_SQL_SESSION_TRADES, (row['id'],)).fetchall() if row else []
+            conn.commit()
+        return (dict(row) if row else {}), trades
+    
     def get_wallet_performance(self, wallet_id: int) -> Dict:
-        with self.get_connection() as conn:
-            cursor = conn.execute(
-                """SELECT 
-                    w.*,
-                    COUNT(t.id) as total_trades,
-                    SUM(CASE WHEN t.status = 'filled' THEN t.size ELSE 0 END) as total_volume,
-                    SUM(t.fees) as total_fees,
-                    AVG(t.price) as avg_price,
-                    MAX(t.timestamp) as last_trade_time
-                FROM wallets w
-                LEFT JOIN trades t ON w.id = t.wallet_id
-                WHERE w.id = ?
-                GROUP BY w.id""",
-                (wallet_id,)
-            )
+        with self.get_read_connection() as conn:
+            cursor = conn.execute(f"{_SQL_WALLET_PERFORMANCE} WHERE w.id = ?", (wallet_id,))
             row = cursor.fetchone()
             return dict(row) if row else {}
     
-    def get_recent_sessions(self, limit: int = 10) -> List[Dict]:
-        with self.get_connection() as conn:
+    def get_wallets_with_performance(self, active_only: bool = True) -> List[sqlite3.Row]:
+        """Return every wallet with its trade aggregates in one query (see get_wallet_performance).
+
+        Rows are returned as-is; they already index by column name.
+        """
+        with self.get_read_connection() as conn:
+            cursor = conn.execute(
+                f"""{_SQL_WALLET_PERFORMANCE}
+                {"WHERE w.is_active = TRUE" if active_only else ""}
+                ORDER BY w.wallet_index"""
+            )
+            return cursor.fetchall()
+    
+    def get_recent_sessions(self, limit: int = 10) -> List[sqlite3.Row]:
+        with self.get_read_connection() as conn:
             cursor = conn.execute(
                 """SELECT * FROM v_active_sessions 
                    ORDER BY start_time DESC 
                    LIMIT ?""",
                 (limit,)
             )
-            return [dict(row) for row in cursor.fetchall()]
+            return cursor.fetchall()
     
     def get_setting(self, key: str) -> Optional[str]:
-        with self.get_connection() as conn:
+        """Return an app setting, served from the in-process cache after the first read."""
+        with self._settings_lock:
+            if key in self._settings:
+                return self._settings[key]
+        with self.get_read_connection() as conn:
             cursor = conn.execute(
                 "SELECT setting_value FROM app_settings WHERE setting_key = ?",
                 (key,)
             )
             row = cursor.fetchone()
-            return row['setting_value'] if row else None
+        value = row['setting_value'] if row else None
+        with self._settings_lock:
+            return self._settings.setdefault(key, value)
     
     def set_setting(self, key: str, value: str) -> None:
         with self.get_connection() as conn:
@@ -283,15 +746,48 @@ class DatabaseManager:
                 (key, value)
             )
             conn.commit()
+        with self._settings_lock:
+            self._settings[key] = value
+    
+    def clear_settings_cache(self) -> None:
+        """Forget cached settings, e.g. after another process changed them."""
+        with self._settings_lock:
+            self._settings.clear()
     
-    def backup_database(self, backup_path: str) -> None:
-        with sqlite3.connect(self.db_path) as source:
+    def backup_database(self, backup_path: str, pages: int = 1000, sleep_ms: float = 10.0,
+                        progress: Optional[Callable[[int, int, int], object]] = None) -> None:
+        """Copy the database to `backup_path` through a read-only source connection.
+
+        The copy runs `pages` pages at a time, pausing `sleep_ms` between steps so the
+        trader's writes can interleave; pass pages=-1 to copy in one step (offline backups).
+        `progress(status, remaining, total)` is called after each step.
+        """
+        self.flush()
+        source = self._connect(read_only=True)
+        try:
             with sqlite3.connect(backup_path) as backup:
-                source.backup(backup)
+                source.backup(backup, pages=pages, progress=progress, sleep=sleep_ms / 1000)
+        finally:
+            source.close()
+    
+    def optimize(self, checkpoint: str = "PASSIVE") -> None:
+        """Refresh query-planner statistics and checkpoint the WAL; cheap enough to run after each session.
+
+        PASSIVE never waits on other connections; TRUNCATE (used after VACUUM) waits for
+        readers and writers so it can reset the WAL file.
+        """
+        self.flush()
+        with self.get_connection() as conn:
+            try:
+                conn.execute("PRAGMA optimize")
+                conn.execute(f"PRAGMA wal_checkpoint({checkpoint})")
+            except sqlite3.OperationalError as exc:
+                self.logger.debug("optimize skipped on %s: %s", self.db_path, exc)
     
     def vacuum_database(self) -> None:
         with sqlite3.connect(self.db_path) as conn:
             conn.execute("VACUUM") 
+        self.optimize(checkpoint="TRUNCATE")
 
     def add_chain_step(self,
                     session_uuid: str,
@@ -301,18 +797,15 @@ class DatabaseManager:
                     is_initial_buy: bool = False,
                     is_final_sell: bool = False) -> None:
         """Insert one row into chain_sequences for UI chain display."""
-        session = self.get_session_by_uuid(session_uuid)
-        if not session:
+        session_id = self._resolve_session_id(session_uuid)
+        if session_id is None:
             raise ValueError(f"Session {session_uuid} not found")
 
         with self.get_connection() as conn:
             conn.execute(
-                """INSERT INTO chain_sequences
-                (session_id, iteration_number, sequence_order, wallet_id,
-                    is_initial_buy, is_final_sell)
-                VALUES (?, ?, ?, ?, ?, ?)""",
+                _SQL_INSERT_CHAIN_STEP,
                 (
-                    session["id"],
+                    session_id,
                     iteration_number,
                     sequence_order,
                     wallet_id,
@@ -327,18 +820,15 @@ class DatabaseManager:
 
         rows format: (iteration_number, sequence_order, wallet_id, is_initial_buy, is_final_sell)
         """
-        session = self.get_session_by_uuid(session_uuid)
-        if not session:
+        session_id = self._resolve_session_id(session_uuid)
+        if session_id is None:
             raise ValueError(f"Session {session_uuid} not found")
 
         with self.get_connection() as conn:
             conn.executemany(
-                """INSERT INTO chain_sequences
-                (session_id, iteration_number, sequence_order, wallet_id,
-                    is_initial_buy, is_final_sell)
-                VALUES (?, ?, ?, ?, ?, ?)""",
+                _SQL_INSERT_CHAIN_STEP,
                 [
-                    (session["id"], it, seq, wid, int(init), int(fin))
+                    (session_id, it, seq, wid, int(init), int(fin))
                     for it, seq, wid, init, fin in rows
                 ],
             )
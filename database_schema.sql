@@ -8,7 +8,13 @@ CREATE TABLE wallets (
     nickname TEXT,
     is_active BOOLEAN DEFAULT TRUE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- trade aggregates, maintained by the trades_counters_* triggers (DatabaseManager)
+    total_trades INTEGER DEFAULT 0,
+    total_volume REAL DEFAULT 0.0,
+    total_fees REAL DEFAULT 0.0,
+    price_sum REAL DEFAULT 0.0,
+    last_trade_time TIMESTAMP
 );
 
 CREATE TABLE market_conditions (
@@ -47,6 +53,10 @@ CREATE TABLE trading_sessions (
     total_volume REAL DEFAULT 0.0,
     profit_loss REAL DEFAULT 0.0,
     notes TEXT,
+    -- trade aggregates, maintained by the trades_counters_* triggers (DatabaseManager)
+    filled_volume REAL DEFAULT 0.0,
+    total_fees REAL DEFAULT 0.0,
+    price_sum REAL DEFAULT 0.0,
     FOREIGN KEY (condition_id) REFERENCES market_conditions(condition_id),
     FOREIGN KEY (token_id) REFERENCES tokens(token_id)
 );
@@ -146,6 +156,9 @@ CREATE INDEX idx_market_data_timestamp ON market_data(timestamp);
 CREATE INDEX idx_chain_sequences_session_id ON chain_sequences(session_id);
 CREATE INDEX idx_app_logs_session_id ON app_logs(session_id);
 CREATE INDEX idx_app_logs_timestamp ON app_logs(timestamp);
+CREATE INDEX idx_app_logs_session_ts ON app_logs(session_id, timestamp DESC);
+CREATE INDEX idx_market_data_token_ts ON market_data(token_id, timestamp DESC);
+CREATE INDEX idx_app_logs_level_ts ON app_logs(log_level, timestamp DESC);
 CREATE INDEX idx_wallet_performance_wallet_id ON wallet_performance(wallet_id);
 
 CREATE TRIGGER update_wallets_timestamp 
@@ -184,25 +197,15 @@ SELECT
     ts.*,
     mc.title as market_title,
     mc.description as market_description,
-    COUNT(t.id) as trade_count,
-    SUM(CASE WHEN t.status = 'filled' THEN t.size ELSE 0 END) as filled_volume
+    ts.total_trades as trade_count
 FROM trading_sessions ts
 LEFT JOIN market_conditions mc ON ts.condition_id = mc.condition_id
-LEFT JOIN trades t ON ts.id = t.session_id
-WHERE ts.status IN ('running', 'completed')
-GROUP BY ts.id;
+WHERE ts.status IN ('running', 'completed');
 
 CREATE VIEW v_wallet_summary AS
-SELECT 
-    w.*,
-    COUNT(t.id) as total_trades,
-    SUM(CASE WHEN t.status = 'filled' THEN t.size ELSE 0 END) as total_volume,
-    SUM(t.fees) as total_fees,
-    MAX(t.timestamp) as last_trade_time
+SELECT w.*
 FROM wallets w
-LEFT JOIN trades t ON w.id = t.wallet_id
-WHERE w.is_active = TRUE
-GROUP BY w.id;
+WHERE w.is_active = TRUE;
 
 CREATE VIEW v_market_summary AS
 SELECT 
@@ -1,107 +1,122 @@
 import argparse
 import json
 import logging
+import sys
 from datetime import datetime
+from typing import List
 from database_manager import DatabaseManager
 from logging_config import configure_logging
 from settings import load_settings
 
 
+# show_logs writes this many lines per stdout call while streaming
+_PAGE_LINES = 1000
+
+
+def _write(lines: List[str]) -> None:
+    """Emit a block of lines with one stdout write instead of a print() per line."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
+
+
 def list_sessions(db_manager: DatabaseManager, limit: int = 10) -> None:
     sessions = db_manager.get_recent_sessions(limit)
-    print(f"\nRecent Trading Sessions (last {limit}):")
-    print("-" * 80)
+    out = [f"\nRecent Trading Sessions (last {limit}):", "-" * 80]
     if not sessions:
-        print("No sessions found.")
-        return
+        out.append("No sessions found.")
     for session in sessions:
-        print(f"Session: {session['session_uuid'][:8]}...")
-        print(f"   Market: {session.get('market_title', 'Unknown')}")
-        print(f"   Status: {session['status']}")
-        print(f"   Volume: {session['volume']}")
-        print(f"   Trades: {session.get('trade_count', 0)}")
-        print(f"   Started: {session['start_time']}")
-        print()
+        out += [
+            f"Session: {session['session_uuid'][:8]}...",
+            f"   Market: {session['market_title'] or 'Unknown'}",
+            f"   Status: {session['status']}",
+            f"   Volume: {session['volume']}",
+            f"   Trades: {session['trade_count']}",
+            f"   Started: {session['start_time']}",
+            "",
+        ]
+    _write(out)
 
 
 def session_details(db_manager: DatabaseManager, session_uuid: str) -> None:
-    summary = db_manager.get_session_summary(session_uuid)
+    summary, trades = db_manager.get_session_details(session_uuid)
     
     if not summary:
-        print(f"Session {session_uuid} not found.")
+        _write([f"Session {session_uuid} not found."])
         return
     
-    print(f"\nSession Details: {session_uuid}")
-    print("-" * 60)
-    print(f"Condition ID: {summary['condition_id']}")
-    print(f"Token ID: {summary['token_id']}")
-    print(f"Status: {summary['status']}")
-    print(f"Volume: {summary['volume']}")
-    print(f"Iterations: {summary['iterations']}")
-    print(f"Start Time: {summary['start_time']}")
+    out = [
+        f"\nSession Details: {session_uuid}",
+        "-" * 60,
+        f"Condition ID: {summary['condition_id']}",
+        f"Token ID: {summary['token_id']}",
+        f"Status: {summary['status']}",
+        f"Volume: {summary['volume']}",
+        f"Iterations: {summary['iterations']}",
+        f"Start Time: {summary['start_time']}",
+    ]
     if summary.get('end_time'):
-        print(f"End Time: {summary['end_time']}")
-    print(f"Total Trades: {summary.get('total_trades', 0)}")
-    print(f"Filled Volume: {summary.get('filled_volume', 0)}")
-    print(f"Total Fees: ${summary.get('total_fees', 0):.4f}")
-    print(f"Avg Price: ${summary.get('avg_price', 0):.4f}")
-    
-    # Get trades for this session
-    with db_manager.get_connection() as conn:
-        cursor = conn.execute(
-            """SELECT t.*, w.nickname, w.wallet_index 
-               FROM trades t
-               JOIN wallets w ON t.wallet_id = w.id
-               JOIN trading_sessions ts ON t.session_id = ts.id
-               WHERE ts.session_uuid = ?
-               ORDER BY t.timestamp""",
-            (session_uuid,)
-        )
-        trades = [dict(row) for row in cursor.fetchall()]
+        out.append(f"End Time: {summary['end_time']}")
+    out += [
+        f"Total Trades: {summary.get('total_trades', 0)}",
+        f"Filled Volume: {summary.get('filled_volume', 0)}",
+        f"Total Fees: ${summary.get('total_fees', 0):.4f}",
+        f"Avg Price: ${summary['avg_price'] or 0:.4f}",
+    ]
     
     if trades:
-        print(f"\nTrades ({len(trades)}):")
-        print("-" * 60)
+        out += [f"\nTrades ({len(trades)}):", "-" * 60]
         for trade in trades:
-            print(f"{trade['side']} {trade['size']} @ ${trade['price']:.4f}")
-            print(f"   Wallet: {trade['nickname']} (#{trade['wallet_index']})")
-            print(f"   Type: {trade['trade_type']}")
-            print(f"   Status: {trade['status']}")
-            print(f"   Time: {trade['timestamp']}")
-            if trade.get('order_id'):
-                print(f"   Order ID: {trade['order_id']}")
-            print()
+            out += [
+                f"{trade['side']} {trade['size']} @ ${trade['price']:.4f}",
+                f"   Wallet: {trade['nickname']} (#{trade['wallet_index']})",
+                f"   Type: {trade['trade_type']}",
+                f"   Status: {trade['status']}",
+                f"   Time: {trade['timestamp']}",
+            ]
+            if trade['order_id']:
+                out.append(f"   Order ID: {trade['order_id']}")
+            out.append("")
+    _write(out)
 
 
 def list_wallets(db_manager: DatabaseManager) -> None:
-    wallets = db_manager.get_wallets()
-    print(f"\nWallets ({len(wallets)}):")
-    print("-" * 80)
+    # one aggregated query instead of a performance lookup per wallet
+    wallets = db_manager.get_wallets_with_performance()
+    out = [f"\nWallets ({len(wallets)}):", "-" * 80]
     
     for wallet in wallets:
-        performance = db_manager.get_wallet_performance(wallet['id'])
         active = 'active' if wallet['is_active'] else 'inactive'
-        print(f"{wallet['nickname']} (#{wallet['wallet_index']}) [{active}]")
-        print(f"   Funder: {wallet['funder_address'][:20]}...")
-        print(f"   Total Trades: {performance.get('total_trades', 0)}")
-        print(f"   Total Volume: {performance.get('total_volume', 0)}")
-        print(f"   Total Fees: ${performance.get('total_fees', 0):.4f}")
-        if performance.get('last_trade_time'):
-            print(f"   Last Trade: {performance['last_trade_time']}")
-        print()
+        out += [
+            f"{wallet['nickname']} (#{wallet['wallet_index']}) [{active}]",
+            f"   Funder: {wallet['funder_address'][:20]}...",
+            f"   Total Trades: {wallet['total_trades']}",
+            f"   Total Volume: {wallet['total_volume'] or 0}",
+            f"   Total Fees: ${wallet['total_fees'] or 0:.4f}",
+        ]
+        if wallet['last_trade_time']:
+            out.append(f"   Last Trade: {wallet['last_trade_time']}")
+        out.append("")
+    _write(out)
 
 
 def show_logs(db_manager: DatabaseManager, session_uuid: str = None, limit: int = 50) -> None:
-    with db_manager.get_connection() as conn:
+    out = [f"\nApplication Logs (last {limit}):", "-" * 80]
+    
+    # resolve the uuid once so the filtered query walks the (session_id, timestamp) index
+    session_id = db_manager.get_session_id(session_uuid) if session_uuid else None
+    if session_uuid and session_id is None:
+        _write(out)
+        return
+    
+    with db_manager.get_read_connection() as conn:
         if session_uuid:
             cursor = conn.execute(
-                """SELECT al.*, ts.session_uuid 
+                """SELECT al.*, ? AS session_uuid
                    FROM app_logs al
-                   LEFT JOIN trading_sessions ts ON al.session_id = ts.id
-                   WHERE ts.session_uuid = ?
+                   WHERE al.session_id = ?
                    ORDER BY al.timestamp DESC
                    LIMIT ?""",
-                (session_uuid, limit)
+                (session_uuid, session_id, limit)
             )
         else:
             cursor = conn.execute(
@@ -113,18 +128,17 @@ def show_logs(db_manager: DatabaseManager, session_uuid: str = None, limit: int
                 (limit,)
             )
         
-        logs = [dict(row) for row in cursor.fetchall()]
-    
-    print(f"\nApplication Logs (last {limit}):")
-    print("-" * 80)
-    
-    for log in logs:
-        session_info = f" [{log['session_uuid'][:8]}...]" if log.get('session_uuid') else ""
-        print(f"{log['timestamp']}{session_info}")
-        print(f"   {log['message']}")
-        if log.get('details'):
-            print(f"   Details: {log['details']}")
-        print()
+        # stream rows from the cursor, writing a page of lines at a time
+        for log in cursor:
+            session_info = f" [{log['session_uuid'][:8]}...]" if log['session_uuid'] else ""
+            out += [f"{log['timestamp']}{session_info}", f"   {log['message']}"]
+            if log['details']:
+                out.append(f"   Details: {log['details']}")
+            out.append("")
+            if len(out) >= _PAGE_LINES:
+                _write(out)
+                out = []
+    _write(out)
 
 
 def backup_database(db_manager: DatabaseManager, backup_path: str = None) -> None:
@@ -0,0 +1,48 @@
+from typing import Any, Iterable, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:  # optional faster decoder for book and market payloads
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json via requests
+    orjson = None
+
+
+# (connect, read) timeout applied to Polymarket REST calls
+DEFAULT_TIMEOUT: Tuple[float, float] = (2.0, 5.0)
+
+
+def build_session(
+    pool_connections: int = 16,
+    pool_maxsize: int = 64,
+    retries: int = 5,
+    backoff_factor: float = 0.5,
+    backoff_max: float = 8.0,
+    status_forcelist: Iterable[int] = (429, 502, 503, 504),
+) -> requests.Session:
+    """Return a keep-alive `requests.Session` with pooled HTTPS connections and retries.
+
+    Throttled (429) and gateway errors are retried with exponential backoff, honouring
+    the server's Retry-After header, so callers can fan out wider without hand-tuned sleeps.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        backoff_max=backoff_max,
+        status_forcelist=tuple(status_forcelist),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount("https://", adapter)
+    return session
+
+
+def json_body(resp: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed."""
+    if orjson is None:
+        return resp.json()
+    return orjson.loads(resp.content)
@@ -1,9 +1,27 @@
 import logging
-import sys
-from typing import Optional
+import time
+from typing import Optional, TextIO, Tuple
 
 
-class _ColorFormatter(logging.Formatter):
+class _Formatter(logging.Formatter):
+    """Formatter that renders asctime once per second instead of once per record."""
+
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None) -> None:
+        super().__init__(fmt, datefmt=datefmt)
+        self._last_time = (-1, "")  # (whole second, formatted asctime), swapped as one tuple
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt is None:  # default format carries milliseconds, nothing to share
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached_second, text = self._last_time
+        if second != cached_second:
+            text = time.strftime(datefmt, self.converter(record.created))
+            self._last_time = (second, text)
+        return text
+
+
+class _ColorFormatter(_Formatter):
     """Lightweight colored formatter for console readability."""
 
     COLORS = {
@@ -15,12 +33,30 @@ class _ColorFormatter(logging.Formatter):
     }
     RESET = "\033[0m"
 
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None,
+                 stream: Optional[TextIO] = None) -> None:
+        super().__init__(fmt, datefmt=datefmt)
+        # colors are only emitted while this stream is a TTY; None always colors
+        self._stream = stream
+        self._wrap = {level: (color, self.RESET) for level, color in self.COLORS.items()}
+
     def format(self, record: logging.LogRecord) -> str:
-        color = self.COLORS.get(record.levelno, "")
-        message = super().format(record)
-        if not color:
+        message = logging.Formatter.format(self, record)
+        wrap = self._wrap.get(record.levelno)
+        if wrap is None or (self._stream is not None and not _isatty(self._stream)):
             return message
-        return f"{color}{message}{self.RESET}"
+        return wrap[0] + message + wrap[1]
+
+
+def _isatty(stream: TextIO) -> bool:
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):  # no isatty, or closed
+        return False
+
+
+# ((level, use_colors), handler) of the last configure_logging call
+_CONFIGURED: Optional[Tuple[Tuple[str, Optional[bool]], logging.Handler]] = None
 
 
 def configure_logging(level: str = "INFO", *, use_colors: Optional[bool] = None) -> None:
@@ -28,14 +64,18 @@ def configure_logging(level: str = "INFO", *, use_colors: Optional[bool] = None)
 
     Args:
         level: Logging level name, e.g., "INFO", "DEBUG".
-        use_colors: Force enable/disable colors; defaults to enabled on TTY.
+        use_colors: Force enable/disable colors; by default colors are applied
+            only while the handler's stream is a TTY, checked per record.
     """
-    if use_colors is None:
-        use_colors = sys.stderr.isatty()
+    global _CONFIGURED
+    key = (level.upper(), use_colors)
+    root = logging.getLogger()
+    # repeated calls with the same arguments keep the installed handler, unless it was removed
+    if _CONFIGURED is not None and _CONFIGURED[0] == key and root.handlers == [_CONFIGURED[1]]:
+        return
 
     logging.captureWarnings(True)
-    root = logging.getLogger()
-    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    root.setLevel(getattr(logging, key[0], logging.INFO))
 
     # Remove existing handlers to avoid duplicates in repeated runs
     for h in list(root.handlers):
@@ -44,10 +84,13 @@ def configure_logging(level: str = "INFO", *, use_colors: Optional[bool] = None)
     handler = logging.StreamHandler()
     fmt = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
     datefmt = "%Y-%m-%d %H:%M:%S"
-    if use_colors:
+    if use_colors is None:
+        handler.setFormatter(_ColorFormatter(fmt, datefmt=datefmt, stream=handler.stream))
+    elif use_colors:
         handler.setFormatter(_ColorFormatter(fmt, datefmt=datefmt))
     else:
-        handler.setFormatter(logging.Formatter(fmt, datefmt=datefmt))
+        handler.setFormatter(_Formatter(fmt, datefmt=datefmt))
     root.addHandler(handler)
+    _CONFIGURED = (key, handler)
 
 
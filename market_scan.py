@@ -6,31 +6,38 @@ from config import build_scanner_client
 from logging_config import configure_logging
 from settings import load_settings
 
+# one row of the cheap markets file; also used as the per-market log message
+_ROW_FMT = "%s  |  %-70s  price=%.4f  spread=%.4f"
+_LINE_FMT = _ROW_FMT + "\n"
 
-def scan_and_write(filepath: str, top_n: int) -> int:
-    """Scan markets and write cheap markets file. Returns count written."""
+
+def scan_and_write(filepath: str, top_n: int, refresh: bool = False) -> int:
+    """Scan markets and write cheap markets file. Returns count written.
+
+    The file is always rewritten, left empty when no scanner can be built. `refresh`
+    skips the cached scan results.
+    """
     client = build_scanner_client()
-    if client is None:
-        return 0
-    markets = client.get_top_markets_by_price(top_n=top_n)
-    count = 0
-    with open(filepath, "w", encoding="utf-8") as f:
-        for m in markets:
-            question = m.get("question") or m.get("title") or ""
-            line = (
-                f"{m['condition_id']}  |  {question:<70}  "
-                f"price={float(m['price']):.4f}  spread={float(m.get('spread', 0)):.4f}"
-            )
-            logging.getLogger(__name__).info(line)
-            f.write(line + "\n")
-            count += 1
-    return count
+    markets = client.get_top_markets_by_price(top_n=top_n, refresh=refresh) if client is not None else []
+    log = logging.getLogger(__name__)
+    log_enabled = log.isEnabledFor(logging.INFO)
+    lines = []
+    for m in markets:
+        question = m.get("question") or m.get("title") or ""
+        # price/spread are floats already: scored from parsed orderbook levels, or cached JSON numbers
+        row = (m["condition_id"], question, m["price"], m.get("spread") or 0.0)
+        lines.append(_LINE_FMT % row)
+        if log_enabled:
+            log.info(_ROW_FMT, *row)
+    Path(filepath).write_text("".join(lines), encoding="utf-8")
+    return len(lines)
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Scan Polymarket markets by price/spread")
     parser.add_argument("--top", type=int, default=50, help="Number of markets to keep")
     parser.add_argument("--out", type=str, help="Output file path (defaults to env setting)")
+    parser.add_argument("--no-cache", action="store_true", help="Rescan instead of reusing cached results")
     args = parser.parse_args()
 
     settings = load_settings()
@@ -39,7 +46,7 @@ def main() -> None:
     outfile = args.out or settings.cheap_markets_file
     Path(outfile).parent.mkdir(parents=True, exist_ok=True)
 
-    count = scan_and_write(outfile, top_n=args.top)
+    count = scan_and_write(outfile, top_n=args.top, refresh=args.no_cache)
     logging.getLogger(__name__).info("Wrote %d markets to %s", count, outfile)
 
 
@@ -1,11 +1,19 @@
+import functools
 import os
-from dataclasses import dataclass
+import re
+import stat
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Optional, Callable, TypeVar
+from typing import Callable, Dict, Optional, Tuple, TypeVar
 
 
 T = TypeVar("T")
 
+# KEY=VALUE with optional surrounding quotes; comments and other lines never match
+_ENV_LINE = re.compile(r"""^[ \t]*([A-Za-z_][A-Za-z0-9_]*)[ \t]*=[ \t]*["']?(.*?)["']?[ \t]*\r?$""", re.M)
+# path -> (mtime_ns, parsed pairs)
+_ENV_CACHE: Dict[str, Tuple[int, Dict[str, str]]] = {}
+
 
 def _parse_bool(value: str) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "y", "on"}
@@ -21,23 +29,28 @@ def _cast(value: Optional[str], default: T, caster: Callable[[str], T]) -> T:
 
 
 def load_env_file(path: str = ".env") -> None:
-    """Load simple KEY=VALUE pairs from a .env file into os.environ if present."""
+    """Load simple KEY=VALUE pairs from a .env file into os.environ if present.
+
+    The parsed pairs are cached per path and reused until the file's mtime changes.
+    """
     env_path = Path(path)
-    if not env_path.exists():
+    try:
+        st = env_path.stat()
+    except OSError:
+        return
+    if not stat.S_ISREG(st.st_mode):
         return
-    for line in env_path.read_text().splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        if "=" not in stripped:
-            continue
-        key, _, val = stripped.partition("=")
-        key = key.strip()
-        val = val.strip().strip('"').strip("'")
+    cached = _ENV_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns:
+        parsed = cached[1]
+    else:
+        parsed = dict(_ENV_LINE.findall(env_path.read_text()))
+        _ENV_CACHE[path] = (st.st_mtime_ns, parsed)
+    for key, val in parsed.items():
         os.environ.setdefault(key, val)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Settings:
     """Runtime application configuration loaded from environment variables."""
 
@@ -50,10 +63,13 @@ class Settings:
     db_path: str = "polyfarm.db"
     wallets_csv: str = "wallets.csv"
     cheap_markets_file: str = "cheap_markets.txt"
+    cache_dir: str = ".cache"
+    markets_cache_ttl_sec: float = 60.0
 
     # Orchestration defaults
     min_active_markets: int = 20
     max_workers: int = 10
+    scan_workers: int = 32
 
     # Trading delays (seconds)
     trade_delay_min: float = 4.0
@@ -66,26 +82,44 @@ class Settings:
     http_timeout_sec: float = 5.0
 
 
+# Settings field -> environment variable; defaults and casts come from the dataclass fields
+_ENV_KEYS = {
+    "clob_host": "CLOB_HOST",
+    "chain_id": "CHAIN_ID",
+    "clob_signature_type": "CLOB_SIGNATURE_TYPE",
+    "db_path": "DB_PATH",
+    "wallets_csv": "WALLETS_CSV",
+    "cheap_markets_file": "CHEAP_MARKETS_FILE",
+    "cache_dir": "CACHE_DIR",
+    "markets_cache_ttl_sec": "MARKETS_CACHE_TTL_SEC",
+    "min_active_markets": "MIN_ACTIVE_MARKETS",
+    "max_workers": "MAX_WORKERS",
+    "scan_workers": "SCAN_WORKERS",
+    "trade_delay_min": "TRADE_DELAY_MIN",
+    "trade_delay_max": "TRADE_DELAY_MAX",
+    "log_level": "LOG_LEVEL",
+    "http_timeout_sec": "HTTP_TIMEOUT_SEC",
+}
+_ENV_FIELDS = tuple(
+    (f.name, _ENV_KEYS[f.name], f.default, type(f.default)) for f in fields(Settings)
+)
+
+
+@functools.lru_cache(maxsize=1)
 def load_settings() -> Settings:
-    """Create a Settings object from environment variables (and optional .env)."""
-    load_env_file()
-
-    def env(key: str, default: T, caster: Callable[[str], T]) -> T:
-        return _cast(os.environ.get(key), default, caster)
-
-    return Settings(
-        clob_host=env("CLOB_HOST", "https://clob.polymarket.com", str),
-        chain_id=env("CHAIN_ID", 137, int),
-        clob_signature_type=env("CLOB_SIGNATURE_TYPE", 2, int),
-        db_path=env("DB_PATH", "polyfarm.db", str),
-        wallets_csv=env("WALLETS_CSV", "wallets.csv", str),
-        cheap_markets_file=env("CHEAP_MARKETS_FILE", "cheap_markets.txt", str),
-        min_active_markets=env("MIN_ACTIVE_MARKETS", 20, int),
-        max_workers=env("MAX_WORKERS", 10, int),
-        trade_delay_min=env("TRADE_DELAY_MIN", 4.0, float),
-        trade_delay_max=env("TRADE_DELAY_MAX", 8.0, float),
-        log_level=env("LOG_LEVEL", "INFO", str).upper(),
-        http_timeout_sec=env("HTTP_TIMEOUT_SEC", 5.0, float),
-    )
+    """Create a Settings object from environment variables (and optional .env).
 
+    The result is cached for the life of the process; call `load_settings.cache_clear()`
+    after changing the environment.
+    """
+    load_env_file()
 
+    environ = os.environ
+    overrides = {}
+    for name, key, default, caster in _ENV_FIELDS:
+        value = environ.get(key)
+        if value is not None:
+            overrides[name] = value if caster is str else _cast(value, default, caster)
+    if "log_level" in overrides:
+        overrides["log_level"] = overrides["log_level"].upper()
+    return Settings(**overrides)
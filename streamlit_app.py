@@ -9,18 +9,62 @@ Assumes the extra views exist in SQLite:
   v_wallet_market_pos, v_chain_sequence
 """
 import sqlite3
+import threading
+from pathlib import Path
+from typing import Tuple
+
 import pandas as pd
 import streamlit as st
 
 DB_PATH = "polyfarm.db"
 
 # ---------- Helpers ----------
-@st.cache_data(ttl=15)
+@st.cache_resource
+def get_conn() -> Tuple[sqlite3.Connection, threading.Lock]:
+    """One long-lived read-only connection shared by every rerun, so its page cache stays warm.
+
+    Browser sessions run on separate script threads; the returned lock serializes their use
+    of the connection. Journal mode is left to DatabaseManager, which owns the file.
+    """
+    uri = f"{Path(DB_PATH).resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)  # plain tuples feed from_records directly
+    conn.execute("PRAGMA cache_size=-20000")  # ~20 MB
+    return conn, threading.Lock()
+
+
+def q_fast(conn: sqlite3.Connection, sql: str, params=()) -> pd.DataFrame:
+    """Build a DataFrame straight from the cursor, skipping read_sql's dialect and type inference."""
+    cur = conn.execute(sql, params)
+    cols = [d[0] for d in cur.description]
+    return pd.DataFrame.from_records(cur.fetchall(), columns=cols)
+
+
+# bounded so browsing many sessions/wallets cannot grow the cache without limit
+@st.cache_data(ttl=15, max_entries=64)
 def q(sql: str, params=None) -> pd.DataFrame:
     """Run a read-only query and return a DataFrame."""
-    with sqlite3.connect(DB_PATH) as conn:
-        conn.row_factory = sqlite3.Row
-        return pd.read_sql(sql, conn, params=params or ())
+    conn, lock = get_conn()
+    with lock:
+        return q_fast(conn, sql, params or ())
+
+
+@st.cache_data(ttl=15)
+def wallet_market_matrix() -> tuple:
+    """Return the filled-position rows, their market x wallet matrix, the sorted market
+    titles and a title -> condition_id map.
+
+    Built from `q()` inside the cache so none of it is recomputed on every rerun.
+    """
+    df = q("SELECT * FROM v_wallet_market_pos")
+    matrix = (
+        df.groupby(["condition_id", "title", "nickname"], sort=False)["filled_size"]
+        .sum()
+        .unstack("nickname", fill_value=0)
+    )
+    titles = sorted(df["title"].unique())
+    title_to_cid = dict(zip(df["title"], df["condition_id"]))
+    return df, matrix, titles, title_to_cid
+
 
 st.set_page_config(page_title="Polyfarm Monitor", layout="wide")
 st.title("Polyfarm Monitor")
@@ -33,24 +77,16 @@ tab1, tab2, tab3, tab4 = st.tabs(["Markets × Wallets", "Sessions", "Wallets", "
 
 # --- Markets × Wallets ---
 with tab1:
-    df = q("SELECT * FROM v_wallet_market_pos")
+    df, pivot, titles, title_to_cid = wallet_market_matrix()
     if df.empty:
         st.info("No filled trades yet.")
     else:
-        pivot = df.pivot_table(
-            index=["condition_id", "title"],
-            columns="nickname",
-            values="filled_size",
-            aggfunc="sum",
-            fill_value=0,
-        )
         st.dataframe(pivot, use_container_width=True)
 
         # Market inspector
-        titles = sorted(df["title"].unique()) if not df.empty else []
         sel = st.selectbox("Inspect market", titles) if titles else None
         if sel:
-            cond_id = df.loc[df["title"] == sel, "condition_id"].iloc[0]
+            cond_id = title_to_cid[sel]
             trades = q(
                 """
                 SELECT t.*, w.nickname
@@ -102,11 +138,13 @@ with tab3:
 # --- Logs ---
 with tab4:
     level = st.selectbox("Level", ["ALL", "INFO", "WARNING", "ERROR"], index=0)
-    sql = "SELECT * FROM app_logs ORDER BY timestamp DESC LIMIT 200"
+    # both branches walk an index (timestamp / log_level+timestamp) instead of sorting the table
+    cols = "timestamp, log_level, session_id, message, details"
+    sql = f"SELECT {cols} FROM app_logs ORDER BY timestamp DESC LIMIT 200"
     params = ()
     if level != "ALL":
         sql = (
-            "SELECT * FROM app_logs WHERE log_level = ? "
+            f"SELECT {cols} FROM app_logs WHERE log_level = ? "
             "ORDER BY timestamp DESC LIMIT 200"
         )
         params = (level,)
@@ -0,0 +1,11 @@
+import pytest
+
+from settings import load_settings
+
+
+@pytest.fixture(autouse=True)
+def _fresh_settings():
+    """Tests change the environment freely; never serve them settings cached by another test."""
+    load_settings.cache_clear()
+    yield
+    load_settings.cache_clear()
@@ -0,0 +1,15 @@
+import cache as cache_module
+from cache import TTLCache
+
+
+def test_ttl_cache_persists_and_expires(tmp_path, monkeypatch):
+    cache = TTLCache(ttl=60, directory=str(tmp_path))
+    cache.set("0xabc", [{"token_id": "1", "outcome": "Yes"}])
+
+    reloaded = TTLCache(ttl=60, directory=str(tmp_path))
+    assert reloaded.get("0xabc") == [{"token_id": "1", "outcome": "Yes"}]
+
+    real_time = cache_module.time.time
+    monkeypatch.setattr(cache_module.time, "time", lambda: real_time() + 120)
+    assert reloaded.get("0xabc") is None
+    assert not (tmp_path / "0xabc.json").exists()
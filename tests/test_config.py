@@ -0,0 +1,86 @@
+import logging
+
+from cache import TTLCache
+from config import PolymarketClient
+
+
+def _book(bid: float, ask: float):
+    return {"bids": [{"price": bid, "size": 10.0}], "asks": [{"price": ask, "size": 10.0}]}
+
+
+def _scanner(books):
+    client = PolymarketClient.__new__(PolymarketClient)
+    client.logger = logging.getLogger("test")
+    client.max_workers = 4
+    client._top_markets_cache = TTLCache(ttl=60)
+    client.get_all_markets = lambda: [{"condition_id": cid} for cid in books]
+    client.get_orderbook = lambda cid, tokens=None: books[cid]
+    return client
+
+
+def test_get_top_markets_by_price_filters_and_sorts():
+    books = {
+        "a": {"Yes": _book(0.50, 0.503), "No": _book(0.49, 0.492)},
+        "b": {"Yes": _book(0.20, 0.202), "No": _book(0.79, 0.792)},
+        "wide": {"Yes": _book(0.10, 0.15), "No": _book(0.85, 0.90)},
+        "one_sided": {"Yes": _book(0.30, 0.302), "No": {"bids": [], "asks": []}},
+    }
+    markets = _scanner(books).get_top_markets_by_price(top_n=5)
+    assert [m["condition_id"] for m in markets] == ["b", "a"]
+    assert markets[0]["price"] == 0.202
+
+
+def test_get_top_markets_by_price_reuses_results_per_top_n():
+    books = {"a": {"Yes": _book(0.50, 0.503), "No": _book(0.49, 0.492)}}
+    client = _scanner(books)
+    first = client.get_top_markets_by_price(top_n=5)
+    client.get_orderbook = lambda cid, tokens=None: {}
+
+    assert client.get_top_markets_by_price(top_n=5) == first
+    assert client.get_top_markets_by_price(top_n=3) == []
+
+
+def test_get_top_markets_by_price_refresh_rescans():
+    books = {"a": {"Yes": _book(0.50, 0.503), "No": _book(0.49, 0.492)}}
+    client = _scanner(books)
+    client._open_markets_cache = TTLCache(ttl=60)
+    client._open_markets_cache.set("open_markets", [{"condition_id": "stale"}])
+    assert client.get_top_markets_by_price(top_n=5)
+
+    client.get_orderbook = lambda cid, tokens=None: {}
+    assert client.get_top_markets_by_price(top_n=5, refresh=True) == []
+    assert client._open_markets_cache.get("open_markets") is None
+
+
+def test_get_orderbook_batches_token_books():
+    from types import SimpleNamespace
+
+    level = lambda p: SimpleNamespace(price=str(p), size="5")
+    calls = []
+
+    def get_order_books(params):
+        calls.append([p.token_id for p in params])
+        return [
+            SimpleNamespace(asset_id="t_no", bids=[level(0.4)], asks=[level(0.42)]),
+            SimpleNamespace(asset_id="t_yes", bids=[level(0.58)], asks=[level(0.6)]),
+        ]
+
+    client = _scanner({})
+    client.client = SimpleNamespace(get_order_books=get_order_books)
+    tokens = [{"token_id": "t_yes", "outcome": "Yes"}, {"token_id": "t_no", "outcome": "No"}]
+    ob = PolymarketClient.get_orderbook(client, "cid", tokens=tokens)
+
+    assert calls == [["t_yes", "t_no"]]
+    assert ob["Yes"]["asks"] == [{"price": 0.6, "size": 5.0}]
+    assert ob["No"]["bids"] == [{"price": 0.4, "size": 5.0}]
+
+
+def test_first_wallet_reads_named_columns(tmp_path):
+    from config import _first_wallet
+
+    path = tmp_path / "wallets.csv"
+    path.write_text("funder,private_key\n\n 0xfunder , 0xkey \n0xother,0xkey2\n")
+    assert _first_wallet(str(path)) == {"private_key": "0xkey", "funder": "0xfunder"}
+
+    path.write_text("private_key,funder\n")
+    assert _first_wallet(str(path)) is None
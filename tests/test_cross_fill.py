@@ -0,0 +1,178 @@
+import json
+
+import cross_fill
+from cache import TTLCache
+from database_manager import DatabaseManager
+
+
+class _FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+
+class _FakeSession:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return _FakeResponse(self.payload)
+
+
+MARKET = {
+    "question": "Will it rain?",
+    "tokens": [
+        {"token_id": "111", "outcome": "Yes"},
+        {"token_id": "222", "outcome": "No"},
+    ],
+}
+
+
+def test_get_prices_and_tokens_stores_market_and_tokens(tmp_path, monkeypatch):
+    session = _FakeSession({"data": [MARKET]})
+    monkeypatch.setattr(cross_fill, "_SESSION", session)
+    monkeypatch.setattr(cross_fill, "_market_cache", TTLCache(ttl=60))
+    db = DatabaseManager(str(tmp_path / "t.db"))
+
+    assert cross_fill.get_prices_and_tokens("0xcond", "no", db) == "222"
+    assert cross_fill.get_prices_and_tokens("0xcond", "yes") == "111"
+    assert cross_fill.get_prices_and_tokens("0xcond", "yes", db) == "111"  # re-entry is a no-op write
+    assert session.calls == 1
+
+    with db.get_connection() as conn:
+        rows = conn.execute("SELECT id, token_id, outcome_side FROM tokens ORDER BY token_id").fetchall()
+        market = conn.execute("SELECT id, title FROM market_conditions").fetchall()
+    assert [tuple(r) for r in rows] == [(1, "111", "yes"), (2, "222", "no")]
+    assert [tuple(r) for r in market] == [(1, "Will it rain?")]
+
+
+def test_poll_with_backoff_stops_on_first_satisfied_probe(monkeypatch):
+    slept = []
+    monkeypatch.setattr(cross_fill.time, "sleep", slept.append)
+    volumes = iter([0.0, 2.0, 5.0, 5.0])
+
+    result = cross_fill.poll_with_backoff(lambda: next(volumes), lambda v: v >= 5, (0.25, 0.5, 1.0, 2.0))
+    assert result == 5.0
+    assert slept == [0.25, 0.5, 1.0]
+
+
+def test_poll_with_backoff_returns_last_result_when_schedule_exhausted(monkeypatch):
+    monkeypatch.setattr(cross_fill.time, "sleep", lambda _: None)
+    assert cross_fill.poll_with_backoff(lambda: 1.0, lambda v: v >= 5, (0.1, 0.1)) == 1.0
+
+
+def test_position_reads_are_reused_until_wallet_posts(monkeypatch):
+    session = _FakeSession([{"outcome": "Yes", "size": 3.0}, {"outcome": "No", "size": 9.0}])
+    monkeypatch.setattr(cross_fill, "_SESSION", session)
+    monkeypatch.setattr(cross_fill, "_POSITION_CACHE", {})
+
+    assert cross_fill.get_yes_position_volume("0xw", "c") == 3.0
+    assert cross_fill.get_yes_position_volume("0xw", "c", max_age=60) == 3.0
+    assert session.calls == 1
+
+    cross_fill.invalidate_positions("0xw")
+    cross_fill.get_yes_position_volume("0xw", "c", max_age=60)
+    assert session.calls == 2
+
+
+def test_fetch_nbbo_handles_empty_sides(monkeypatch):
+    book = {"bids": [{"price": "0.41"}, {"price": "0.43"}], "asks": []}
+    monkeypatch.setattr(cross_fill, "_SESSION", _FakeSession(book))
+    assert cross_fill.fetch_nbbo("111") == (0.43, None)
+
+
+class _FakeClobClient:
+    def __init__(self):
+        self.signed = []
+        self.posted = []
+
+    def create_order(self, args):
+        self.signed.append(args)
+        return ("signed", args.side)
+
+    def post_order(self, order, orderType=None):
+        self.posted.append(order)
+        return {"orderID": f"{order[1]}-{len(self.posted)}"}
+
+
+def test_place_orders_uses_presigned_orders():
+    from py_clob_client.clob_types import OrderArgs
+
+    seller = {"client": _FakeClobClient(), "wallet_address": "0xs"}
+    buyer = {"client": _FakeClobClient(), "wallet_address": "0xb"}
+    sell = OrderArgs(price=0.5, size=5, side="SELL", token_id="111")
+    buy = OrderArgs(price=0.5, size=5, side="BUY", token_id="111")
+
+    presigned = cross_fill.presign_orders((seller, sell), (buyer, buy))
+    responses = cross_fill.place_orders((seller, sell), (buyer, buy), presigned=presigned)
+
+    assert responses == [{"orderID": "SELL-1"}, {"orderID": "BUY-1"}]
+    assert len(seller["client"].signed) == len(buyer["client"].signed) == 1
+
+
+def test_cancel_if_open_skips_filled_orders():
+    class Client:
+        def __init__(self, status):
+            self.status = status
+            self.cancelled = []
+
+        def get_order(self, order_id):
+            return {"id": order_id, "status": self.status}
+
+        def cancel(self, order_id):
+            self.cancelled.append(order_id)
+            return {"canceled": [order_id]}
+
+    filled, live = Client("MATCHED"), Client("LIVE")
+    assert cross_fill.cancel_if_open(filled, "o1") is None
+    assert cross_fill.cancel_if_open(live, "o2") == {"canceled": ["o2"]}
+    assert filled.cancelled == [] and live.cancelled == ["o2"]
+
+
+def test_record_sequence_writes_one_row_per_wallet(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    with db.get_connection() as conn:
+        conn.execute("INSERT INTO market_conditions (condition_id) VALUES ('c1')")
+        conn.execute("INSERT INTO tokens (token_id, condition_id, outcome_side) VALUES ('t1', 'c1', 'yes')")
+        conn.commit()
+    group = [{"db_id": db.add_wallet(i, f"pk{i}", f"0x{i}")} for i in range(3)]
+    session = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=3)
+
+    cross_fill.record_sequence(db, session, 0, group, mark_initial=True, mark_final=True)
+
+    with db.get_connection() as conn:
+        rows = conn.execute(
+            "SELECT sequence_order, wallet_id, is_initial_buy, is_final_sell FROM chain_sequences ORDER BY sequence_order"
+        ).fetchall()
+    assert [tuple(r) for r in rows] == [(0, group[0]["db_id"], 1, 0), (1, group[1]["db_id"], 0, 0), (2, group[2]["db_id"], 0, 1)]
+
+
+def test_load_wallets_bulk_inserts_and_reuses_ids(tmp_path):
+    csv_path = tmp_path / "wallets.csv"
+    csv_path.write_text("private_key,funder\npk0,0xa\n\npk1,0xb\n")
+    db = DatabaseManager(str(tmp_path / "t.db"))
+
+    first = cross_fill.load_wallets(str(csv_path), db)
+    again = cross_fill.load_wallets(str(csv_path), db)
+
+    assert [w["wallet_address"] for w in first] == ["0xa", "0xb"]
+    assert [w["db_id"] for w in again] == [w["db_id"] for w in first]
+    assert len(db.get_wallets(active_only=False)) == 2
+
+
+def test_backoff_delays_grow_and_cap():
+    assert cross_fill.backoff_delays(3) == (0.5, 0.8, 0.5 * 1.6 ** 2)
+    assert cross_fill.backoff_delays(12)[-1] == 8.0
+    assert 12.5 < sum(cross_fill._FILL_POLL_DELAYS) < 14
+    assert 7.5 < sum(cross_fill._MATCH_POLL_DELAYS) < 8.5
@@ -0,0 +1,50 @@
+import json
+
+import cross_fill_runner
+
+
+def test_get_active_markets_from_file_keeps_file_order(tmp_path, monkeypatch):
+    path = tmp_path / "cheap.txt"
+    path.write_text("0xa  |  A  price=0.1\n\n0xb  |  B\n0xc  |  C\n")
+    monkeypatch.setattr(cross_fill_runner, "is_market_active", lambda cid, timeout: cid != "0xb")
+
+    assert cross_fill_runner.get_active_markets_from_file(str(path), 1.0) == ["0xa", "0xc"]
+    assert cross_fill_runner.get_active_markets_from_file(str(tmp_path / "missing.txt"), 1.0) == []
+
+
+class _Response:
+    def __init__(self, status_code, payload=None, etag=None):
+        self.status_code = status_code
+        self._payload = payload
+        self.headers = {"ETag": etag} if etag else {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+    def json(self):
+        return self._payload
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+
+def test_is_market_active_reuses_flag_on_not_modified(monkeypatch):
+    sent = []
+    responses = [
+        _Response(200, {"active": True, "closed": False, "accepting_orders": True}, etag='"v1"'),
+        _Response(304),
+    ]
+
+    class _Session:
+        def get(self, url, timeout, headers=None):
+            sent.append(headers)
+            return responses.pop(0)
+
+    monkeypatch.setattr(cross_fill_runner, "_SESSION", _Session())
+    monkeypatch.setattr(cross_fill_runner, "_MARKET_ETAGS", {})
+
+    assert cross_fill_runner.is_market_active("0xa", 1.0) is True
+    assert cross_fill_runner.is_market_active("0xa", 1.0) is True
+    assert sent == [None, {"If-None-Match": '"v1"'}]
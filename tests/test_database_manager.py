@@ -0,0 +1,302 @@
+import sqlite3
+
+import pytest
+
+import database_manager
+from database_manager import DatabaseManager
+
+
+def _seed_market(db):
+    with db.get_connection() as conn:
+        conn.execute("INSERT INTO market_conditions (condition_id, title) VALUES ('c1', 'T')")
+        conn.execute(
+            "INSERT INTO tokens (token_id, condition_id, outcome_side, outcome_label) VALUES ('t1', 'c1', 'yes', 'Yes')"
+        )
+        conn.commit()
+
+
+def test_database_uses_wal_journal(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -64000
+
+
+def test_token_and_market_data_lookups(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    _seed_market(db)
+
+    assert db.get_token_id("c1", "YES") == "t1"
+    assert db.get_token_id("c1", "no") is None
+
+    assert db.get_recent_market_data("t1", 2.0) is None
+    db.save_market_data("t1", 0.40, 0.42)
+    recent = db.get_recent_market_data("t1", 2.0)
+    assert (recent["best_bid"], recent["best_ask"]) == (0.40, 0.42)
+
+
+def test_connection_is_reused_and_discards_uncommitted_work(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    with db.get_connection() as first:
+        first.execute("INSERT INTO market_conditions (condition_id, title) VALUES ('c1', 'T')")
+    with db.get_connection() as second:
+        assert second is first
+        assert second.execute("SELECT COUNT(*) FROM market_conditions").fetchone()[0] == 0
+
+    db.close()
+    with db.get_connection() as reopened:
+        assert reopened is not first
+
+
+def test_read_connections_are_pooled_and_read_only(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    db.set_setting("k", "v")
+    with db.get_read_connection() as reader:
+        assert reader.execute("SELECT setting_value FROM app_settings WHERE setting_key = 'k'").fetchone()[0] == "v"
+        with pytest.raises(sqlite3.OperationalError):
+            reader.execute("DELETE FROM app_settings")
+    assert db.get_setting("k") == "v"
+    with db.get_read_connection() as again:
+        assert again is reader
+
+
+def test_log_messages_are_buffered_until_flush(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+
+    def stored_logs():
+        with db.get_read_connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM app_logs").fetchone()[0]
+
+    db.log_message("one")
+    db.log_message("two", "WARNING")
+    assert stored_logs() == 0
+
+    db.flush()
+    assert stored_logs() == 2
+
+    for i in range(DatabaseManager.BATCH_SIZE):
+        db.log_message(f"burst {i}")
+    assert stored_logs() == 2 + DatabaseManager.BATCH_SIZE
+
+    db.log_message("last")
+    db.close()
+    assert stored_logs() == 3 + DatabaseManager.BATCH_SIZE
+
+
+def test_buffered_rows_are_flushed_by_timer_without_further_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(DatabaseManager, "FLUSH_INTERVAL_SEC", 0.05)
+    path = str(tmp_path / "t.db")
+    db = DatabaseManager(path)
+    db.log_message("hello")
+    timer = db._flush_timer
+    del db  # the pending timer keeps the manager alive until it has flushed
+
+    timer.join(2)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM app_logs WHERE message = 'hello'").fetchone()[0] == 1
+
+
+def test_failed_flush_keeps_buffered_rows(tmp_path):
+    path = str(tmp_path / "t.db")
+    db = DatabaseManager(path)
+    with db.get_connection() as conn:
+        conn.execute("PRAGMA busy_timeout = 0")
+    db.log_message("one")
+    db.log_message("two")
+
+    blocker = sqlite3.connect(path)
+    blocker.execute("BEGIN IMMEDIATE")
+    with pytest.raises(sqlite3.OperationalError):
+        db.flush()
+    db.log_message("three")
+    blocker.rollback()
+    blocker.close()
+
+    db.flush()
+    with db.get_read_connection() as conn:
+        messages = [r[0] for r in conn.execute("SELECT message FROM app_logs ORDER BY id")]
+    assert messages[-3:] == ["one", "two", "three"]
+
+
+def test_session_id_is_resolved_once(tmp_path, monkeypatch):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    _seed_market(db)
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+    wallet_id = db.add_wallet(0, "pk", "0xa")
+
+    def no_lookup(_):
+        raise AssertionError("session id should come from the cache")
+
+    monkeypatch.setattr(db, "get_session_by_uuid", no_lookup)
+    db.log_trade(session_uuid, wallet_id, "t1", "BUY", 0.5, 5, "initial_buy")
+    db.add_chain_batch(session_uuid, [(0, 0, wallet_id, True, False)])
+    db.update_session_status(session_uuid, "completed")
+    with pytest.raises(ValueError):
+        db.log_trade("unknown", wallet_id, "t1", "BUY", 0.5, 5, "initial_buy")
+
+    monkeypatch.undo()
+    assert db.get_session_by_uuid(session_uuid)["status"] == "completed"
+
+
+def test_reporting_indexes_are_ensured_on_existing_databases(tmp_path):
+    path = str(tmp_path / "t.db")
+    db = DatabaseManager(path)
+    with db.get_connection() as conn:
+        conn.execute("DROP INDEX idx_app_logs_session_ts")
+    db.close()
+
+    db = DatabaseManager(path)
+    with db.get_read_connection() as conn:
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_app_logs_session_ts", "idx_app_logs_level_ts", "idx_market_data_token_ts", "idx_sessions_uuid"} <= names
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_log_trades_returns_ids_in_order(tmp_path, monkeypatch, returning):
+    monkeypatch.setattr(database_manager, "_HAS_RETURNING", returning)
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    _seed_market(db)
+    ids = db.add_wallets_bulk([(0, "pk0", "0xa", None), (1, "pk1", "0xb", None)])
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+
+    first = db.log_trade(session_uuid, ids[0], "t1", "BUY", 0.5, 5, "initial_buy")
+    pair = db.log_trades(session_uuid, [
+        (ids[1], "t1", "BUY", 0.5, 5, "chain_match", "b"),
+        (ids[0], "t1", "SELL", 0.5, 5, "chain_match", "s"),
+    ])
+
+    assert pair == [first + 1, first + 2]
+    with db.get_read_connection() as conn:
+        sides = [tuple(r) for r in conn.execute("SELECT id, side, order_id FROM trades ORDER BY id")]
+    assert sides == [(first, "BUY", None), (pair[0], "BUY", "b"), (pair[1], "SELL", "s")]
+
+
+def test_trade_counters_follow_inserts_and_fills(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    _seed_market(db)
+    ids = db.add_wallets_bulk([(0, "pk0", "0xa", None)])
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+    first = db.log_trade(session_uuid, ids[0], "t1", "BUY", 0.4, 5, "initial_buy")
+    db.log_trade(session_uuid, ids[0], "t1", "SELL", 0.6, 5, "final_sell")
+    db.update_trade_status(first, "filled", fill_price=0.4, fill_size=5, fees=0.1)
+
+    summary = db.get_session_summary(session_uuid)
+    assert (summary["total_trades"], summary["filled_volume"], summary["total_fees"]) == (2, 5, 0.1)
+    assert summary["avg_price"] == pytest.approx(0.5)
+    wallet = db.get_wallet_performance(ids[0])
+    assert (wallet["total_trades"], wallet["total_volume"]) == (2, 5)
+    assert wallet["last_trade_time"] is not None
+
+
+def test_trade_counters_are_backfilled_on_existing_databases(tmp_path):
+    path = str(tmp_path / "t.db")
+    db = DatabaseManager(path)
+    _seed_market(db)
+    ids = db.add_wallets_bulk([(0, "pk0", "0xa", None)])
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+    with db.get_connection() as conn:
+        for name in ("trades_counters_insert", "trades_counters_update", "trades_counters_delete"):
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP VIEW v_wallet_summary")
+        conn.execute("ALTER TABLE wallets DROP COLUMN price_sum")
+        conn.commit()
+    db.log_trade(session_uuid, ids[0], "t1", "BUY", 0.5, 5, "initial_buy")
+    db.close()
+
+    db = DatabaseManager(path)
+    assert db.get_wallet_performance(ids[0])["total_trades"] == 1
+    assert db.get_session_summary(session_uuid)["total_trades"] == 1
+
+
+def test_optimize_flushes_and_truncates_wal(tmp_path):
+    path = tmp_path / "t.db"
+    db = DatabaseManager(str(path))
+    db.log_message("pending")
+    with db.get_connection() as conn:
+        assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == db.WAL_AUTOCHECKPOINT_PAGES
+
+    db.optimize(checkpoint="TRUNCATE")
+
+    assert (tmp_path / "t.db-wal").stat().st_size == 0
+    with db.get_read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM app_logs WHERE message = 'pending'").fetchone()[0] == 1
+
+
+def test_failed_counter_migration_is_rolled_back_and_retried(tmp_path, monkeypatch):
+    path = str(tmp_path / "t.db")
+    db = DatabaseManager(path)
+    _seed_market(db)
+    ids = db.add_wallets_bulk([(0, "pk0", "0xa", None)])
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+    with db.get_connection() as conn:
+        for name in ("trades_counters_insert", "trades_counters_update", "trades_counters_delete"):
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("DROP VIEW v_wallet_summary")
+        conn.execute("ALTER TABLE wallets DROP COLUMN price_sum")
+        conn.commit()
+    db.log_trade(session_uuid, ids[0], "t1", "BUY", 0.5, 5, "initial_buy")
+    db.close()
+
+    monkeypatch.setattr(DatabaseManager, "_COUNTER_VIEWS", ("SELECT * FROM missing_table",))
+    DatabaseManager(path).close()
+    with sqlite3.connect(path) as conn:
+        assert "price_sum" not in {row[1] for row in conn.execute("PRAGMA table_info(wallets)")}
+
+    monkeypatch.undo()
+    db = DatabaseManager(path)
+    assert db.get_wallet_performance(ids[0])["total_trades"] == 1
+
+
+@pytest.mark.parametrize("returning", [True, False])
+def test_add_wallet_returns_new_id(tmp_path, monkeypatch, returning):
+    monkeypatch.setattr(database_manager, "_HAS_RETURNING", returning)
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    first = db.add_wallet(0, "pk0", "0xa")
+    second = db.add_wallet(1, "pk1", "0xb", "Wallet_1")
+
+    assert second == first + 1
+    assert db.get_wallet_performance(second)["nickname"] == "Wallet_1"
+
+
+def test_settings_are_cached_and_updated_by_set_setting(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    assert db.get_setting("missing") is None
+    db.set_setting("k", "v1")
+    with db.get_connection() as conn:  # out-of-band change, e.g. another process
+        conn.execute("UPDATE app_settings SET setting_value = 'v2' WHERE setting_key = 'k'")
+        conn.commit()
+
+    assert db.get_setting("k") == "v1"
+    db.clear_settings_cache()
+    assert db.get_setting("k") == "v2"
+
+
+def test_backup_copies_in_steps_with_progress(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    db.set_setting("k", "v")
+    steps = []
+
+    db.backup_database(str(tmp_path / "copy.db"), pages=1, sleep_ms=0,
+                       progress=lambda status, remaining, total: steps.append(remaining))
+
+    assert len(steps) > 1 and steps[-1] == 0
+    copy = sqlite3.connect(str(tmp_path / "copy.db"))
+    assert copy.execute("SELECT setting_value FROM app_settings WHERE setting_key = 'k'").fetchone()[0] == "v"
+    copy.close()
+
+
+def test_session_uuid_is_plain_hex(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    _seed_market(db)
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+    assert len(session_uuid) == 32 and int(session_uuid, 16) >= 0
+    assert db.get_session_by_uuid(session_uuid)["session_uuid"] == session_uuid
+
+
+def test_foreign_keys_are_enforced_on_the_writer_only(tmp_path):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    with db.get_connection() as writer:
+        assert writer.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    with db.get_read_connection() as reader:
+        assert reader.execute("PRAGMA foreign_keys").fetchone()[0] == 0
@@ -0,0 +1,76 @@
+import json
+
+import db_utils
+from database_manager import DatabaseManager
+
+
+def test_list_wallets_uses_one_aggregated_query(tmp_path, monkeypatch, capsys):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    db.add_wallets_bulk([(0, "pk0", "0xa", "Wallet_0"), (1, "pk1", "0xb", "Wallet_1")])
+    monkeypatch.setattr(db, "get_wallet_performance", lambda _: (_ for _ in ()).throw(AssertionError))
+
+    db_utils.list_wallets(db)
+
+    out = capsys.readouterr().out
+    assert "Wallets (2):" in out
+    assert "Wallet_1 (#1) [active]" in out
+    assert "Total Fees: $0.0000" in out
+
+
+def test_show_logs_prints_rows_without_dict_conversion(tmp_path, capsys):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    db.log_message("hello", details={"k": 1})
+    db.flush()
+
+    db_utils.show_logs(db, limit=5)
+
+    out = capsys.readouterr().out
+    assert "   hello" in out
+    assert json.loads(out.split("Details: ")[1].splitlines()[0]) == {"k": 1}
+
+
+def test_session_details_reads_summary_and_trades_together(tmp_path, capsys):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    with db.get_connection() as conn:
+        conn.execute("INSERT INTO market_conditions (condition_id, title) VALUES ('c1', 'T')")
+        conn.execute(
+            "INSERT INTO tokens (token_id, condition_id, outcome_side, outcome_label) VALUES ('t1', 'c1', 'yes', 'Yes')"
+        )
+        conn.commit()
+    ids = db.add_wallets_bulk([(0, "pk0", "0xa", "Wallet_0")])
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+    db.log_trade(session_uuid, ids[0], "t1", "BUY", 0.5, 5, "initial_buy", "oid-1")
+
+    summary, trades = db.get_session_details(session_uuid)
+    assert summary["session_uuid"] == session_uuid
+    assert summary["total_trades"] == 1
+    assert summary["avg_price"] == 0.5
+    assert [t["order_id"] for t in trades] == ["oid-1"]
+    assert db.get_session_details("missing") == ({}, [])
+
+    db_utils.session_details(db, session_uuid)
+    out = capsys.readouterr().out
+    assert "Trades (1):" in out
+    assert "Wallet: Wallet_0 (#0)" in out
+
+
+def test_show_logs_filters_by_resolved_session_id(tmp_path, capsys):
+    db = DatabaseManager(str(tmp_path / "t.db"))
+    with db.get_connection() as conn:
+        conn.execute("INSERT INTO market_conditions (condition_id, title) VALUES ('c1', 'T')")
+        conn.execute(
+            "INSERT INTO tokens (token_id, condition_id, outcome_side, outcome_label) VALUES ('t1', 'c1', 'yes', 'Yes')"
+        )
+        conn.commit()
+    session_uuid = db.create_session("c1", "t1", volume=5, iterations=1, initial_wallet_count=5)
+    db.log_message("in session", session_uuid=session_uuid)
+    db.log_message("unrelated")
+    db.flush()
+
+    db_utils.show_logs(db, session_uuid, limit=5)
+    out = capsys.readouterr().out
+    assert f"[{session_uuid[:8]}...]" in out
+    assert "in session" in out and "unrelated" not in out
+
+    db_utils.show_logs(db, "missing", limit=5)
+    assert "in session" not in capsys.readouterr().out
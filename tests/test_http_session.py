@@ -0,0 +1,27 @@
+import pytest
+
+import http_session
+
+
+class _Response:
+    content = b'{"bids": [{"price": "0.41"}]}'
+
+    def json(self):
+        return {"decoded_by": "requests"}
+
+
+def test_json_body_falls_back_to_requests_without_orjson(monkeypatch):
+    monkeypatch.setattr(http_session, "orjson", None)
+    assert http_session.json_body(_Response()) == {"decoded_by": "requests"}
+
+
+def test_json_body_decodes_raw_content_with_orjson(monkeypatch):
+    monkeypatch.setattr(http_session, "orjson", pytest.importorskip("orjson"))
+    assert http_session.json_body(_Response()) == {"bids": [{"price": "0.41"}]}
+
+
+def test_build_session_retries_throttling_with_retry_after():
+    retry = http_session.build_session().get_adapter("https://clob.polymarket.com").max_retries
+    assert 429 in retry.status_forcelist
+    assert retry.respect_retry_after_header
+    assert retry.total == 5
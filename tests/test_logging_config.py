@@ -0,0 +1,62 @@
+import io
+import logging
+import time
+
+from logging_config import _ColorFormatter
+
+
+class _Stream(io.StringIO):
+    def __init__(self, tty):
+        super().__init__()
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+def _record(level=logging.INFO):
+    return logging.LogRecord("x", level, __file__, 1, "hello %s", ("world",), None)
+
+
+def test_color_formatter_checks_the_stream_per_record():
+    stream = _Stream(tty=False)
+    formatter = _ColorFormatter("%(message)s", stream=stream)
+    assert formatter.format(_record()) == "hello world"
+
+    stream.tty = True
+    assert formatter.format(_record()) == "\033[32mhello world\033[0m"
+    assert _ColorFormatter("%(message)s").format(_record(logging.ERROR)).startswith("\033[31m")
+
+
+def test_formatter_reuses_asctime_within_a_second(monkeypatch):
+    from logging_config import _Formatter
+
+    formatter = _Formatter("%(asctime)s %(message)s", datefmt="%H:%M:%S")
+    calls = []
+    real_strftime = time.strftime
+    monkeypatch.setattr(time, "strftime", lambda *a: calls.append(a) or real_strftime(*a))
+    first, second, later = _record(), _record(), _record()
+    second.created = first.created
+    later.created = first.created + 1
+
+    assert formatter.format(first) == formatter.format(second)
+    formatter.format(later)
+    assert len(calls) == 2
+
+
+def test_configure_logging_skips_identical_reconfiguration():
+    from logging_config import configure_logging
+
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    try:
+        configure_logging("debug", use_colors=False)
+        handler = root.handlers[0]
+        configure_logging("DEBUG", use_colors=False)
+        assert root.handlers == [handler]
+
+        configure_logging("INFO", use_colors=False)
+        assert root.handlers != [handler] and root.level == logging.INFO
+    finally:
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
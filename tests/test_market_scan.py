@@ -10,3 +10,21 @@ def test_scan_and_write_handles_no_wallets(tmp_path, monkeypatch):
     assert out.exists()
     assert out.read_text() == ""
 
+
+def test_scan_and_write_writes_one_line_per_market(tmp_path, monkeypatch):
+    import market_scan
+
+    class _Client:
+        def get_top_markets_by_price(self, top_n, refresh=False):
+            return [
+                {"condition_id": "0xa", "question": "A?", "price": 0.1, "spread": 0.002},
+                {"condition_id": "0xb", "title": "B", "price": 0.25, "spread": None},
+            ]
+
+    monkeypatch.setattr(market_scan, "build_scanner_client", lambda: _Client())
+    out = tmp_path / "out.txt"
+    assert scan_and_write(str(out), top_n=5) == 2
+    assert out.read_text().splitlines() == [
+        f"0xa  |  {'A?':<70}  price=0.1000  spread=0.0020",
+        f"0xb  |  {'B':<70}  price=0.2500  spread=0.0000",
+    ]
@@ -20,7 +20,62 @@ def test_load_settings_defaults(monkeypatch):
 def test_load_settings_overrides(monkeypatch):
     monkeypatch.setenv("DB_PATH", "x.db")
     monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+    load_settings.cache_clear()
     s = load_settings()
     assert s.db_path == "x.db"
     assert s.log_level == "DEBUG"
 
+
+def test_load_settings_is_cached_until_cleared(monkeypatch):
+    monkeypatch.setenv("DB_PATH", "a.db")
+    first = load_settings()
+    monkeypatch.setenv("DB_PATH", "b.db")
+    assert load_settings() is first
+
+    load_settings.cache_clear()
+    assert load_settings().db_path == "b.db"
+
+
+def test_load_env_file_parses_pairs(tmp_path, monkeypatch):
+    from settings import load_env_file
+
+    for key in ("ENV_A", "ENV_B", "ENV_C", "ENV_EMPTY"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("ENV_C", "kept")
+    path = tmp_path / ".env"
+    path.write_text('# comment\nENV_A = "quoted value"\n\nnot a pair\nENV_EMPTY=\nENV_B=\'x=y\'\nENV_C=ignored\n')
+
+    load_env_file(str(path))
+    assert os.environ["ENV_A"] == "quoted value"
+    assert os.environ["ENV_B"] == "x=y"
+    assert os.environ["ENV_EMPTY"] == ""
+    assert os.environ["ENV_C"] == "kept"
+    load_env_file(str(tmp_path))  # a directory is skipped, not read
+
+
+def test_load_settings_casts_and_falls_back_on_bad_values(monkeypatch):
+    monkeypatch.setenv("CHAIN_ID", "not-a-number")
+    monkeypatch.setenv("MAX_WORKERS", "4")
+    monkeypatch.setenv("HTTP_TIMEOUT_SEC", "2.5")
+    s = load_settings()
+    assert (s.chain_id, s.max_workers, s.http_timeout_sec) == (137, 4, 2.5)
+
+
+def test_load_env_file_reparses_only_when_mtime_changes(tmp_path, monkeypatch):
+    import settings
+
+    path = tmp_path / ".env"
+    path.write_text("ENV_CACHED=one\n")
+    monkeypatch.delenv("ENV_CACHED", raising=False)
+    settings.load_env_file(str(path))
+    assert settings._ENV_CACHE[str(path)][1] == {"ENV_CACHED": "one"}
+
+    reads = []
+    monkeypatch.setattr(settings.Path, "read_text", lambda self: reads.append(self) or "ENV_CACHED=two\n")
+    settings.load_env_file(str(path))
+    assert reads == []
+
+    os.utime(path, ns=(0, 0))
+    monkeypatch.delenv("ENV_CACHED")
+    settings.load_env_file(str(path))
+    assert os.environ["ENV_CACHED"] == "two"